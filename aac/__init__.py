@@ -0,0 +1 @@
+# Data and analysis helpers shared by the Streamlit app and the notebook pipeline
@@ -0,0 +1,95 @@
+# Per-account lookups for the account details page
+#
+# The transactions are kept sorted by account (then time) with an offset
+# index: rows offsets[i]:offsets[i + 1] are the transactions of accounts[i].
+# A lookup is one binary search in the account numbers and one contiguous
+# slice of the frame, and the account's row of the users table (RFM values,
+# cluster, holder details) is found through a hash index on acct_num, so no
+# lookup scans the transactions. The store is built once per dataset version;
+# published datasets are already sorted by account, so building it only finds
+# the boundaries between accounts. It keeps only the columns the account page
+# shows, which are all that is read when the transactions come from the
+# partitioned dataset (aac/dataset.py).
+#
+#   python -m aac.accounts 798000000000   # RFM, cluster and transactions of one account
+import sys
+
+import numpy as np
+import pandas as pd
+
+from aac.loader import derived, load_users, query_transactions
+
+SORT_COLS = ['acct_num', 'trans_datetime']
+
+# Columns of the transactions kept by the store
+ACCOUNT_COLUMNS = SORT_COLS + ['category', 'category_type', 'amt']
+
+
+def sort_by_account(df):
+    # Stable, so rows with the same account and time keep their order
+    # (np.lexsort on the two key columns is about twice as fast as sort_values)
+    order = np.lexsort([df[col].to_numpy() for col in reversed(SORT_COLS)])
+    return df.take(order).reset_index(drop=True)
+
+
+class AccountStore:
+    def __init__(self, transactions, users):
+        acct = transactions['acct_num'].to_numpy()
+        if not (np.all(acct[1:] >= acct[:-1]) and self._times_sorted(transactions, acct)):
+            transactions = sort_by_account(transactions)
+            acct = transactions['acct_num'].to_numpy()
+        self.transactions = transactions.reset_index(drop=True)
+
+        # First row of each account, plus the end of the last one
+        starts = np.flatnonzero(np.concatenate([[True], acct[1:] != acct[:-1]])) if len(acct) else np.array([], dtype=np.int64)
+        self.accounts = acct[starts]
+        self.offsets = np.append(starts, len(acct))
+
+        # Checking uniqueness also builds the hash table, before the first lookup
+        self.users = users.reset_index(drop=True)
+        self._user_index = pd.Index(self.users['acct_num'])
+        if not self._user_index.is_unique:
+            raise ValueError('users has more than one row for some acct_num')
+
+    @staticmethod
+    def _times_sorted(df, acct):
+        # Times increase inside each account (accounts already sorted)
+        times = df['trans_datetime'].to_numpy()
+        return bool(np.all((times[1:] >= times[:-1]) | (acct[1:] != acct[:-1])))
+
+    def __contains__(self, acct_num):
+        return acct_num in self._user_index or self._position(acct_num) is not None
+
+    def _position(self, acct_num):
+        i = np.searchsorted(self.accounts, acct_num)
+        return i if i < len(self.accounts) and self.accounts[i] == acct_num else None
+
+    def transactions_of(self, acct_num):
+        # Rows of one account, oldest first (empty if it has none)
+        i = self._position(acct_num)
+        if i is None:
+            return self.transactions.iloc[:0]
+        return self.transactions.iloc[self.offsets[i]:self.offsets[i + 1]]
+
+    def user(self, acct_num):
+        # The account's row of the users table (None if it is not there)
+        if acct_num not in self._user_index:
+            return None
+        return self.users.iloc[self._user_index.get_loc(acct_num)]
+
+    def lookup(self, acct_num):
+        # (users row or None, transactions); KeyError for an unknown account
+        if acct_num not in self:
+            raise KeyError(f'no account {acct_num}')
+        return self.user(acct_num), self.transactions_of(acct_num)
+
+
+def account_store():
+    return derived('accounts', lambda: AccountStore(query_transactions(ACCOUNT_COLUMNS), load_users()))
+
+
+if __name__ == '__main__':
+    user, transactions = account_store().lookup(int(sys.argv[1]))
+    if user is not None:
+        print(user.to_string(), end='\n\n')
+    print(transactions.to_string(max_rows=20))
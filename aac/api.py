@@ -0,0 +1,205 @@
+# JSON API for the cluster profiles
+#
+# A plain ASGI application (no framework needed), served by any ASGI server:
+#
+#   uvicorn aac.api:app --port 8000
+#   python -m aac.api --port 8000   # same, if uvicorn is installed
+#
+#   GET /clusters                   cluster ids and the dataset version
+#   GET /clusters/{k}               every part of the profile of cluster k
+#   GET /clusters/{k}/{part}        one part: info, generations, spending_by_type,
+#                                   spending_by_category or monthly_spending
+#   POST /score                     cluster of new accounts from their RFM values:
+#                                   {"rfm": [recency, freq, mv]} -> {"label": k}, or
+#                                   {"rfm": [[...], ...]} -> {"labels": [...]}
+#                                   (503 while there is no readable cluster model)
+#
+# Each response body is computed once per dataset version and then served from
+# memory. Responses carry a strong ETag, and a request whose If-None-Match
+# matches it gets an empty 304. Single accounts sent to /score are scored in
+# micro-batches with the other requests arriving at the same time.
+import asyncio
+import hashlib
+import json
+import threading
+
+import pandas as pd
+
+from aac import summaries
+from aac.loader import dataset_version
+from aac.lru import VersionedLRU
+from aac.scoring import MicroBatcher, Scorer
+
+
+# Same policy as the figure cache: LRU, cleared when the dataset version changes
+response_cache = VersionedLRU(maxsize=256)
+
+SCORE_USAGE = 'expected {"rfm": [recency, freq, mv]} or a list of them'
+
+_started = False
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def _startup():
+    # On lifespan startup, or on the first request for servers that do not
+    # send lifespan events. The summaries are computed from frames shared by
+    # every request (see aac/loader.py), so copy-on-write is turned on for
+    # the server process rather than when this module is imported.
+    global _started
+    if not _started:
+        pd.set_option('mode.copy_on_write', True)
+        _started = True
+
+
+def _get_batcher():
+    # Created on the first /score request, so that the other routes work without a model
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = MicroBatcher(Scorer())
+        return _batcher
+
+
+class NotFound(Exception):
+    pass
+
+
+def _payload(path):
+    parts = [part for part in path.split('/') if part]
+    if parts == ['clusters']:
+        return {'version': dataset_version(), 'clusters': summaries.clusters()}
+    if len(parts) in (2, 3) and parts[0] == 'clusters':
+        try:
+            k = int(parts[1])
+        except ValueError:
+            raise NotFound(f'no cluster {parts[1]}')
+        if len(parts) == 3 and parts[2] not in summaries.PARTS:
+            raise NotFound(f'no part {parts[2]}')
+        try:
+            return summaries.cluster_profile(k, summaries.PARTS if len(parts) == 2 else [parts[2]])
+        except KeyError as err:
+            raise NotFound(err.args[0])
+    raise NotFound(f'no route {path}')
+
+
+def _entry(payload):
+    body = json.dumps(payload, separators=(',', ':')).encode()
+    return body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _etag_matches(if_none_match, etag):
+    # If-None-Match holds "*" or a list of (possibly weak) entity tags
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in [tag[2:] if tag.startswith('W/') else tag for tag in tags]
+
+
+async def _respond(send, status, body=b'', headers=()):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(name.encode(), value.encode()) for name, value in headers]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _error(send, status, message):
+    body = json.dumps({'error': message}).encode()
+    await _respond(send, status, body, [('content-type', 'application/json'),
+                                        ('content-length', str(len(body)))])
+
+
+async def _read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+async def _score(receive, send):
+    try:
+        rfm = json.loads(await _read_body(receive))['rfm']
+    except (ValueError, KeyError, TypeError) as err:
+        await _error(send, 400, f'{SCORE_USAGE} ({err})')
+        return
+    try:
+        batcher = _get_batcher()
+        batcher.scorer.refresh()
+    except (OSError, ValueError, KeyError, TypeError) as err:
+        # No model file yet (python -m aac.clustering bootstrap), or not a readable one
+        await _error(send, 503, f'no usable cluster model ({err!r})')
+        return
+    try:
+        if rfm and isinstance(rfm[0], list):
+            labels = await asyncio.to_thread(batcher.scorer.score, rfm)
+            payload = {'labels': labels.tolist()}
+        else:
+            payload = {'label': await asyncio.wrap_future(batcher.submit(rfm))}
+    except (ValueError, KeyError, TypeError, IndexError) as err:
+        await _error(send, 400, f'{SCORE_USAGE} ({err})')
+        return
+    body = json.dumps(payload).encode()
+    await _respond(send, 200, body, [('content-type', 'application/json'), ('content-length', str(len(body)))])
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                _startup()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    if scope['type'] != 'http':
+        return
+    _startup()
+    if scope['path'] == '/score':
+        if scope['method'] != 'POST':
+            await _error(send, 405, 'only POST is supported')
+            return
+        await _score(receive, send)
+        return
+    if scope['method'] not in ('GET', 'HEAD'):
+        await _error(send, 405, 'only GET and HEAD are supported')
+        return
+
+    # Loading and aggregating run in a worker thread so that the event loop
+    # keeps answering the requests that are already cached
+    path = scope['path'].rstrip('/') or '/'
+    version = await asyncio.to_thread(dataset_version)
+    entry = response_cache.get(version, path)
+    if entry is None:
+        try:
+            payload = await asyncio.to_thread(_payload, path)
+        except NotFound as err:
+            await _error(send, 404, str(err))
+            return
+        entry = response_cache.put(version, path, _entry(payload))
+
+    body, etag = entry
+    headers = [('etag', etag), ('cache-control', 'no-cache')]
+    request_headers = dict(scope['headers'])
+    if_none_match = request_headers.get(b'if-none-match')
+    if if_none_match is not None and _etag_matches(if_none_match.decode('latin-1'), etag):
+        await _respond(send, 304, headers=headers)
+        return
+
+    headers += [('content-type', 'application/json'), ('content-length', str(len(body)))]
+    await _respond(send, 200, b'' if scope['method'] == 'HEAD' else body, headers)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit('uvicorn is needed to serve the API (pip install uvicorn), '
+                         'or serve aac.api:app with another ASGI server')
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -0,0 +1,153 @@
+# Clustering the accounts on their scaled RFM values
+#
+# The accounts are streamed in batches: a first pass fits the scaler and the
+# next passes fit a mini-batch K-Means, so the RFM table never has to be held
+# as one scaled matrix. A refit starts from the centroids of the previous model
+# and its clusters are matched to the previous ones, so that a cluster keeps
+# its id (e.g. "Digital Dynamos" stays cluster 3) across refits.
+#
+#   python -m aac.clustering bootstrap   # model (and pipeline reference) from the labels in s1_users_csv.csv
+#   python -m aac.clustering refit [k]   # refit on the RFM state
+import argparse
+import json
+import os
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.preprocessing import StandardScaler
+
+from aac.config import CLUSTER_MODEL, REFERENCE_DATE
+from aac.files import atomic_write
+
+FEATURES = ['recency', 'freq', 'mv']
+
+
+def iter_batches(df, batch_size=100_000, columns=FEATURES):
+    for start in range(0, len(df), batch_size):
+        yield df[columns].iloc[start:start + batch_size].to_numpy(dtype=float)
+
+
+def scale(model, X):
+    return (np.asarray(X, dtype=float) - model['scaler_mean']) / model['scaler_scale']
+
+
+def scaled_centroids(model):
+    # The transposed centroids in the scaled space and their squared norms,
+    # which assign_clusters needs; computed once by callers that assign many
+    # batches with the same model
+    centroids = scale(model, model['centroids'])
+    return centroids.T.copy(), (centroids ** 2).sum(axis=1)
+
+
+def assign_clusters(model, X, centroids=None):
+    # Nearest centroid (in the scaled space) for each row of raw RFM values.
+    # |x - c|^2 = |x|^2 - 2 x.c + |c|^2 for all rows and centroids at once is
+    # one matrix product; |x|^2 is the same for every centroid and left out.
+    centroids_t, centroid_norms = scaled_centroids(model) if centroids is None else centroids
+    distances = centroid_norms - 2 * scale(model, X) @ centroids_t
+    return np.asarray(model['cluster_ids'])[distances.argmin(axis=1)]
+
+
+def match_cluster_ids(previous, model):
+    # Give each new cluster the id of the closest previous cluster (one to one),
+    # and fresh ids to the clusters left over when k grows
+    old = scale(model, previous['centroids'])
+    new = scale(model, model['centroids'])
+    cost = ((new[:, None, :] - old[None, :, :]) ** 2).sum(axis=2)
+    new_rows, old_rows = linear_sum_assignment(cost)
+
+    cluster_ids = [None] * len(new)
+    for new_row, old_row in zip(new_rows, old_rows):
+        cluster_ids[new_row] = previous['cluster_ids'][old_row]
+
+    next_id = max(previous['cluster_ids']) + 1
+    for row in range(len(new)):
+        if cluster_ids[row] is None:
+            cluster_ids[row] = next_id
+            next_id += 1
+    return cluster_ids
+
+
+def fit_clusters(batches, k, previous=None, epochs=5, random_state=42):
+    # `batches` returns a fresh iterator over the raw RFM values on each call
+    scaler = StandardScaler()
+    for X in batches():
+        scaler.partial_fit(X)
+
+    # Warm start from the previous centroids when the number of clusters is
+    # unchanged. Small clusters are then kept rather than reassigned to dense
+    # regions, otherwise a refit could drop a cluster the dashboard relies on.
+    init, reassignment_ratio = 'k-means++', 0.01
+    if previous is not None and len(previous['centroids']) == k:
+        init = scaler.transform(np.asarray(previous['centroids'], dtype=float))
+        reassignment_ratio = 0.0
+
+    kmeans = MiniBatchKMeans(n_clusters=k, init=init, n_init=1, random_state=random_state,
+                             reassignment_ratio=reassignment_ratio)
+    for _ in range(epochs):
+        for X in batches():
+            kmeans.partial_fit(scaler.transform(X))
+
+    model = {'features': FEATURES,
+             'scaler_mean': scaler.mean_.tolist(),
+             'scaler_scale': scaler.scale_.tolist(),
+             'centroids': scaler.inverse_transform(kmeans.cluster_centers_).tolist(),
+             'cluster_ids': list(range(k))}
+    if previous is not None:
+        model['cluster_ids'] = match_cluster_ids(previous, model)
+    return model
+
+
+def bootstrap_model(users):
+    # Model matching the clusters already assigned to the users (the notebook's
+    # KMeans run): the same StandardScaler and the mean RFM values of each label
+    X = users[FEATURES].to_numpy(dtype=float)
+    centroids = users.groupby('labels', observed=True)[FEATURES].mean()
+    return {'features': FEATURES,
+            'scaler_mean': X.mean(axis=0).tolist(),
+            'scaler_scale': X.std(axis=0).tolist(),
+            'centroids': centroids.to_numpy().tolist(),
+            'cluster_ids': [int(label) for label in centroids.index]}
+
+
+def load_model(path=CLUSTER_MODEL):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_model(model, path=CLUSTER_MODEL):
+    with atomic_write(path) as tmp_path, open(tmp_path, 'w') as f:
+        json.dump(model, f, indent=2)
+
+
+def refit(rfm, k=6, path=CLUSTER_MODEL, batch_size=100_000):
+    previous = load_model(path)
+    model = fit_clusters(lambda: iter_batches(rfm, batch_size), k, previous)
+    save_model(model, path)
+    labels = np.concatenate([assign_clusters(model, X) for X in iter_batches(rfm, batch_size)])
+    return model, labels
+
+
+if __name__ == '__main__':
+    import pandas as pd
+
+    from aac.config import CLUSTER_REFERENCE, USERS_CSV
+    from aac.rfm import load_rfm_state, rfm_from_state
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', choices=['bootstrap', 'refit'])
+    parser.add_argument('k', type=int, nargs='?', default=6, help='number of clusters of the refit')
+    parser.add_argument('--model', default=CLUSTER_MODEL)
+    parser.add_argument('--reference', default=CLUSTER_REFERENCE, help='also written by bootstrap')
+    args = parser.parse_args()
+
+    if args.command == 'bootstrap':
+        model = bootstrap_model(pd.read_csv(USERS_CSV))
+        save_model(model, args.model)
+        save_model(model, args.reference)
+    else:
+        model, labels = refit(rfm_from_state(load_rfm_state(), REFERENCE_DATE), args.k, args.model)
+        print(pd.Series(labels).value_counts().sort_index().to_string())
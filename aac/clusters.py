@@ -0,0 +1,36 @@
+# Profiled clusters of the Results page
+#
+# The name and the write-up of each cluster shown on the Results page, in the
+# order they are shown. The page renders every cluster listed here that is in
+# the data; profiling another cluster (e.g. after a refit with a different k)
+# only needs another entry.
+CLUSTERS = {
+    1: {
+        'name': "Cyber Savvy Shoppers",
+        'generations': "Majority of the customers of this class are from the Baby Boomers generation. Note that this cluster had a high recency, high frquency, and high monetary value. Which means that this cluster is the cream of the crop of the company, they are the highest valued customers.",
+        'physical_digital': "From this graph, we notice that across the generations, the average spending on digital categories is greater than any other categories. Interestingly enough, the **average spending of the Silent Generation in the digital category is equal to the average spending of the Baby Boomers** even though there is <u>significantly more Baby Boomers</u> in this cluster.",
+        'categories': "In terms of specific categories across the generations, majority of the spendings are still on digital categories. Specifically for Baby Boomers and Generation X, they tend to spend more on Online Shopping while the Silent Generation tends to spend more on the Online Miscellaneous category.<br><br>This simply indicates that for this cluster, they tend to use their card and spend more through online methods rather than physical components. However, it doesn't mean that these generations don't spend their cards for physical categories. In fact, it can be seen that for all generations, they tend to spend more for categories such as Physical Grocery compared to its counterpart (Online Grocery).",
+        'monthly': "Overall, the **average monthly spending on digital categories** across the the whole timeline of the transaction history is **greater than** then physical categories, especially in the month of October. This may indicate that this cluster tend to use their cards more in the month of October, which the company can capitalize on by <u>doing more promotions and offers for online products</u> in this month.<br><br>Furthermore, it can be seen that for the month of November and the start of December, this cluster tends to spend their cards more on physical transactions rather than digital. This may imply that **during the Christmas season, this cluster may tend to go out and use their cards as they physically meet people**, which can potentially be another marketing approach for the company. Specifically, the company can <u>offer discounts or special deals for the Christmas season</u>.",
+    },
+    2: {
+        'name': "Epic Comeback Connoisseurs",
+        'generations': "Majority of the customers of this class are from the Baby Boomers generation as well. But the difference is that there are also customers who are part of the Greatest Generation, which are those who are of age 95 and above. Note that this cluster had a medium recency, low frquency, and low monetary value which means that this cluster **contains the customers who are slowly using their cards less**.",
+        'physical_digital': "From this graph, we notice that across the generations, the **average spending on digital categories is greater than any other categories, except for Generation X**. For this generation, they tend to **spend more on the others categories**, with the digital category coming close. For the Greatest Generation, we see that they spend on Physical and Digital Categories almost equally.",
+        'categories': "From further examination, we see that majority of the **average monthly spendings are indeed on online categories** such as Online Shopping and Online Miscellaneous. However, we can also see that these set of customers **spend little to no money on a lot of categories**, especially the **categories that may not be as essential** to them anymore such as travel, entertainment, etc. Also, for the **Greatest Generation, we see that they frequently spend a lot on both the Physical and Online Shopping**, which may suggest that this generation just loves to shop in general.",
+        'monthly': "Overall, the **average monthly spending on digital categories** across the the whole timeline of the transaction history is **greater than** then physical categories. However, we notice a negative trend over the year, then a sudden spike, and slowly decline again. This may indicate that for certain periods, the cluster will **suddenly splurge and use their cards but as time passes, they will use their cards less**. This may be resisted by offering promotions or deals when the company notices a sudden decline of card usage for this cluster. The promotions should be done such that it encourages the cluster to use their card, especially through the categories they frequent in such as Online Shopping.",
+    },
+    3: {
+        'name': "Digital Dynamos",
+        'generations': "Majority of the customers of this class are from the Baby Boomers generation with an equal amount of Generation X and Silent Generation. This cluster has a high recency, high frequency, and high monetary value, which is similar to the first cluster. The difference is that this cluster had a higher frquency and monetary value, **making them the most elite of the elite customers**.",
+        'physical_digital': "From this graph, again, across the generations, we see that the **average spending on digital categories is greater than any other categories**. The difference from the first cluster is that the overall average spending for all types of categories are slightly greater.",
+        'categories': "Looking into the average monthly spending per category, the graph shows that **all generations have a high average on Online Shopping and Travel**. Aside from Shopping, the average monthly spending between online categories and physical categories are close, which indicates that for this cluster, **they tend to use their card either way** (online or physical).",
+        'monthly': "Overall, the **average monthly spending on digital categories** across the the whole timeline of the transaction history is **greater than** then physical categories. We also notice a lot of dips and sudden spikes on the monthly spending in digital transactions. This may indicate that this cluster may prefer **online means depending on the season or possible deals and offers available in the online medium**. But, we also see that for both years, **there is a spike in the month of April**, which the company can capitalize on. Further analysis on the transaction history could reveal more patterns between the spending behavior depending on the season or month.<br><br>Based on the graph, **there is also a constant average spending on physical categoreies**, which is another aspect the company can focus on. That is, instead of solely focusing on online deals and promotions, the company can continuously capitalize on the consistent physical spending to help maintain (or grow) the cluster's high monetary value.",
+    },
+    5: {
+        'name': "Festive Spenders",
+        'generations': "Majority of the customers of this class are from the Baby Boomers generation with a decent amount from Generation X and Silent Generation and one user from the Greatest Generation. This cluster has a high recency, medium frequency, and medium monetary value, which makes this set of customers the typical customers of the company that **moderately uses their cards but more than the average customer**.",
+        'physical_digital': "From this graph, again, across the generations, we see that the **average spending on digital categories is greater than any other categories**. Also, we notice that across the different types of catergories, the **average spending of the customer in the Greatest Generation is close or exceeds the average spending of the other generations** despite there being less customers in that generation.",
+        'categories': "Doing a further examination into the specific categories, the graph shows that **all generations have a high average on Online Categories**. Furthermore, we see a **high average monthly spending on the Travel category for the Greatest Generation**, which shows a possible marketing angle the company could take for this generation in this cluster (or for that sole customer). Other than that, there is a more or less moderate spending on all categories which indicate that **even if this cluster doesn't spend that much, they still use their cards for any type of purchases** (whether it's online or physical).",
+        'monthly': "Overall, the **average monthly spending on digital categories** across the the whole timeline of the transaction history is **greater than** then physical categories. There is a particularly high spike on digital transactions in the month of January 2021, which may need further examination. The graph showcases that in some months, this cluster mainly uses their card for physical transactions but whenever they use it for these types of transactions, they spend little to none. However, **when they spend on digital categories, they seem to have an overall higher average monthly spending**. The company can take advantage of this by doing <u>promotions and deals for online transactions to further increase</u> the average monthly spending on these types of transactions.",
+    },
+}
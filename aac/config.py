@@ -0,0 +1,83 @@
+# Constants shared by the dashboard and the data pipeline
+import os
+
+# Dataset locations (relative to the project root, where `streamlit run app.py` is
+# started). AAC_DATA_DIR points everything at another data directory.
+DATA_DIR = os.environ.get('AAC_DATA_DIR', 'data')
+USERS_CSV = os.path.join(DATA_DIR, 's1_users_csv.csv')
+TRANSACTIONS_CSV = os.path.join(DATA_DIR, 's1_final_csv.csv')
+CACHE_DIR = os.path.join(DATA_DIR, '.cache')
+
+# Outputs of the pipeline stages, one directory per stage and cache key (python -m aac.pipeline)
+PIPELINE_CACHE = os.path.join(CACHE_DIR, 'pipeline')
+
+# The labeled transactions as a Parquet dataset partitioned by year and cluster
+TRANSACTIONS_DATASET = os.path.join(DATA_DIR, 'transactions')
+
+# Published dataset shared by the server processes (python -m aac.publish): the
+# Arrow files of each version and a pointer to the current one
+PUBLISHED_DIR = os.path.join(DATA_DIR, 'published')
+PUBLISHED_POINTER = os.path.join(PUBLISHED_DIR, 'CURRENT')
+
+# Dividing the categories into physical, digital, or others
+PHYSICAL_CATS = ['grocery_pos', 'gas_transport', 'shopping_pos', 'misc_pos']
+DIGITAL_CATS = ['grocery_net', 'shopping_net', 'misc_net']
+CATEGORY_TYPES = ['Physical', 'Digital', 'Others']
+
+# Generations from the oldest to the youngest (same labels used in the notebook)
+GENERATIONS = ['Greatest Generation', 'Silent Generation', 'Baby Boomers',
+               'Generation X', 'Millenials', 'Generation Z', 'Generation Alpha']
+
+# Raw transactions and the cleaned output of the preprocessing pipeline
+RAW_CSV = 'cc_dirty.csv'
+CLEAN_DIR = os.path.join(DATA_DIR, 'clean')
+
+# Ages, recency and elapsed days are measured from this date (AAC_REFERENCE_DATE overrides it)
+REFERENCE_DATE = os.environ.get('AAC_REFERENCE_DATE', '2022-01-01')
+
+# Birth years of each generation, used with pd.cut (right=True)
+GENERATION_BINS = [float('-inf'), 1927, 1945, 1964, 1980, 1996, 2012, float('inf')]
+
+# Running recency/frequency/monetary totals per account
+RFM_STATE = os.path.join(DATA_DIR, 'rfm_state.parquet')
+
+# Scaler parameters, centroids and cluster ids of the current KMeans model
+CLUSTER_MODEL = os.path.join(DATA_DIR, 'cluster_model.json')
+
+# The model with the cluster ids aac/clusters.py describes (from python -m
+# aac.clustering bootstrap). The pipeline matches its clusters to this one,
+# which its exports never replace, so rerunning it does not move the ids.
+CLUSTER_REFERENCE = os.path.join(DATA_DIR, 'cluster_reference.json')
+
+# Sketches of the cleaned transactions (distinct accounts, top values, quantiles)
+SKETCHES = os.path.join(DATA_DIR, 'sketches.json')
+
+# Colors used by the dashboard
+COLOR_RED = "#ce3c1b"
+COLOR_YELLOW = "#f5ba01"
+COLOR_LIGHTGREEN = "#9acba2"
+COLOR_GREEN = "#41916c"
+COLOR_BLUE = "#213875"
+COLORS = [COLOR_RED, COLOR_BLUE, COLOR_GREEN, COLOR_YELLOW, COLOR_LIGHTGREEN]
+
+# Display names of the categories
+CATEGORY_NAMES = {"grocery_pos": "Physical Grocery",
+                  "shopping_pos": "Physical Shopping",
+                  "gas_transport": "Gas and Transportation",
+                  "kids_pets": "Kids and Pets",
+                  "home": "Home",
+                  "no_category": "No Category",
+                  "personal_care": "Personal Care",
+                  "food_dining": "Food and Dining",
+                  "entertainment": "Entertainment",
+                  "misc_pos": "Physical Miscellaneous",
+                  "health_fitness": "Health and Fitness",
+                  "shopping_net": "Online Shopping",
+                  "travel": "Travel",
+                  "misc_net": "Online Miscellaneous",
+                  "grocery_net": "Online Grocery"}
+
+# Timing sinks of aac.instrument (both off unless set) and the admin timing panel
+METRICS_JSONL = os.environ.get('AAC_METRICS_JSONL')
+METRICS_PROM = os.environ.get('AAC_METRICS_PROM')
+ADMIN_PANEL = os.environ.get('AAC_ADMIN_PANEL') == '1'
@@ -0,0 +1,192 @@
+# Static content of the dashboard pages
+#
+# The page text does not depend on the data, so it is built once when the
+# module is first imported instead of on every rerun of app.py, and importing
+# it only needs aac.config (no pandas or Plotly). The pages that show no data
+# are rendered from this module alone.
+from aac.config import COLOR_RED
+
+PROJ_TITLE = "An Analysis on AAC's Customers and their Spending Behaviors"
+
+# HTML Styles
+HTML_STYLES = f"""<style>
+    h3 {{
+        color: {COLOR_RED};
+    }}
+
+    h4 {{
+        padding-bottom: 0;
+    }}
+
+    p {{
+        font-size: 1.125rem;
+        text-align: justify;
+    }}
+
+    .card-design-red {{
+        padding: 15px 30px;
+        box-shadow: -8px -7px {COLOR_RED};
+        border: 1px solid grey;
+        border-radius: 20px;
+        margin-top: 10px;
+    }}
+
+    .italicized {{
+        font-style: italic;
+    }}
+
+    .capitalized {{
+        text-transform: uppercase;
+    }}
+
+    .tabbed {{
+        margin-left: 1.75rem;
+        margin-top: 0;
+    }}
+</style>
+"""
+
+# About the Project
+HOME_HTML = """<style>
+    .cards-container {
+        display: flex;
+        flex-wrap: wrap;
+        gap: 2.5rem;
+        text-align: center;
+    }
+
+    .card {
+        flex: 15%;
+    }
+
+    .card p {
+        text-align: center;
+        padding: 0 1.5rem;
+    }
+
+    .bullet-title {
+        margin-bottom: 0;
+    }
+
+    .st-emotion-cache-eqffof li {
+        font-size: 1.1rem;
+    }
+</style>
+<h3>About the Project</h3>
+<p>This project is about analyzing the company Adobo Advantage Cards (AAC). The main objective of this project is to gather information about AAC's customers based on their transaction history and suggest actionable steps the business can take to maintain or improve their customer's spending behaviors.</p>
+
+<h3>Goals and Objectives</h3>
+<p class='italicized'>How do we better drive the business?</p>
+<div class='cards-container'>
+    <div class='card card-design-red'>
+        <h4>Customer Demographics</h4>
+        <p>Understand the customers of the company</p>
+        <p class='italicized'>Who are they?</p>
+    </div>
+    <div class="card card-design-red">
+        <h4>Spending Behaviors</h4>
+        <p>Understand how the customers spend their money or use their credit card</p>
+        <p class="italicized">What do they keep buying?</p>
+    </div>
+    <div class='card card-design-red'>
+        <h4>Steps and Strategies</h4>
+        <p>Recommend actionable items to drive business growth</p>
+        <p class='italicized'>What can AAC do knowing all this informtion?</p>
+    </div>
+</div>
+
+<br>
+
+<h3>About the Dataset</h3>
+<p class='italicized'>What kind of information do we have?</p>
+<div>
+    <p>Transaction History Period: <span class='capitalized'>Jan 01, 2020 - Dec 07, 2021</span></p>
+    <p class='bullet-title'>The dataset includes</p>
+    <ul>
+        <li>Different columns related to one's transaction
+            <ul>
+                <li>cc_num, acct_num, dob, job, amt, category, etc.</li>
+            </ul>
+        </li>
+        <li>The "category" column was divided into three parts: physical, digital, and others
+            <ul>
+                <li>Example categories: grocery_pos, kids_pets, gas_trans, shopping_net, etc.</li>
+                <li>net = digital transactions; pos = physical transactions</li>
+            </ul>
+        </li>
+    <ul>
+</div>
+
+<br>
+
+<h3>Scopes and Limitations</h3>
+<p class='italicized'>What are the assumptions made? What did we analyze and cover?</p>
+<p>The scope of the analysis is limited to 2020 to 2021 since that is the period covered by the dataset. Furthermore, it was assumed that the COVID-19 pandemic did not occur during this transaction period since it was discovered that majority of the customers are part of the older generations.</p>
+<p>To ensure consistency, the categories that did not specify whether it was physical or digital were considered as "others". This is to ensure that there is no ambuigity between the transactions. Listed below are the categories considered to be physical, digital, or others.</p>
+<ul>
+    <li>Physical: grocery_pos, gas_transport, shopping_pos, misc_pos</li>
+    <li>Digital: grocery_net, shopping_net, misc_net</li>
+    <li>Others: kids_pets, food_dining, home, health_fitness, travel</li>
+</ul>"""
+
+# Results
+RFM_TABLE = """| Cluster | Recency Value | Frequency Value | Monetary Value |
+| ------- | ------------- | --------------- | -------------- |
+| 0       | Low (316)     | Low (8)         | Low (5,382)    |
+| 1       | High (25)     | High (1,309)    | High (91,383)  |
+| 2       | Medium (124)  | Low (11)        | Low (5,136)    |
+| 3       | High (25)     | Very High (1,957)| Very High (133,899) |
+| 4       | Low (604)     | Low (8)         | Low (4,434)    |
+| 5       | High (25)     | Medium (656)    | Medium (45,917)|"""
+
+FINDINGS_SUMMARY = "To summarize, the KMeans clustering gave 6 unique clusters, each having their own RFM values. From there, 4 were named as the following:\n- Cyber Savvy Shoppers\n- Epic Comeback Connoisseurs\n- Digital Dynamos\n- Festive Spenders"
+
+FINDINGS_DETAILS = (
+    'From there, each cluster was further examined based on their spending. The following aspects were found:\n'
+    '1. Cyber Savvy Shoppers\n'
+    '\t- composed of 21 users and 27497 transactions\n'
+    '\t- had a high average spending on digital transactions across all the generations\n'
+    '\t\t- despite there being less customers in the Silent Generation than Baby Boomers age bracket, the digital spending of the Silent Generation is equal to that of the Baby Boomers\n'
+    '\t- majority of the spendings are on online categories except for Grocery (they spend more on Physical Grocery over Online Grocery)\n'
+    '\t- this cluster still spends a decent amount for physical categories\n'
+    '\t- tend to spend more on October and in the Christmas season\n'
+    '\t- **Recommendations:**\n'
+    '\t\t- give enhanced cashback for online transactions which can be done through Cyber Monday or Black Friday\n'
+    '\t\t- offer more promotions and offers for online products by partnering with E-Commerce platforms (free shipping, early access to products, exclusive deals, etc.) to encourage their online shopping\n'
+    '\t\t- offer discounts and special deals during the Christmas season\n'
+    '\t\t- partner with groceries for a customer loyalty program to encourage physical grocery shopping while encouraging them to make impulse purchases but also ensuring that you show care for the customers through coupons and rewards\n'
+    '2. Epic Comeback Connoisseurs\n'
+    '\t- composed of 12 users and 132 transactions\n'
+    '\t\t- majority of which are part of the Baby Boomers while the rest of the generations had 2 users\n'
+    '\t- generally had a high average spending on digital transactions but Generation X also had a high average spending on transactions part of the others category\n'
+    '\t- majority of the spendings are on digital categories but overall, this cluster barely used their cards due to the little to no transactions on majority of the categories\n'
+    '\t- this cluster has a declining trend in terms of average monthly spending\n'
+    '\t\t- this indicates that as time passes by, this cluster uses their cards less or has the tendency to forget about using their cards\n'
+    '\t- **Recommendations:**\n'
+    '\t\t- give discounts for purchases made to popular retailers (especially for essentials) to encourage them to use their card more\n'
+    "\t\t- offer free trials or samples for the categories they don't spend on such as Entertainment or Health and Fitness\n"
+    '\t\t- offer cashback rewards during key dates (anniversaries, birthdays, holidays, etc.) to encourage them to keep their card active which serves as a reminder about the existence of the card\n'
+    '3. Digital Dynamos\n'
+    '\t- composed of 25 users and 48,490 transactions\n'
+    '\t- had a high average spending on digital transactions across all geenrations\n'
+    '\t\t- specifically in the Online Shopping category\n'
+    '\t- has a high average spending on the Travel category\n'
+    '\t- in general, this cluster tends to use their cards both for physical and online transactions\n'
+    '\t\t- but the timeline shows that overall, the average spending through online means is higher throughout the year\n'
+    '\t- **Recommendations:**\n'
+    '\t\t- offer double points on digital purchases to maximize and further encourage their spending\n'
+    '\t\t- personalized online offers based on the platform and categories they frequently purchase in\n'
+    '\t\t- offer customized benefits such as discounts on luxury goods and services, provide upgrades to first-class travel, hotels, etc.\n'
+    '\t\t- host exclusive or private networking events for this cluster to promote exclusivity\n'
+    '\t\t- offer deals and promotions for physical categories such as partnerships with grocery stores to capitalize on the constant spending in physical categories\n'
+    '4. Festive Spenders\n'
+    '\t- composed of 24 users and 15,755 transactions\n'
+    '\t- had a high average spending in the digital categories but Generation X also had a high average spending in the other categories compared to the other generations\n'
+    '\t\t- specifically, Generation X had a high spending in the Travel category which we may hypothesize that they are frequent travelers\n'
+    '\t- there is a decent spending on all categories which indicate that this cluster is not a frequent spender but generally uses their card for any type of purchase\n'
+    '\t- overall, based on the timeline, this cluster tends to spend more on digital categories\n'
+    '\t- **Recommendations:**\n'
+    '\t\t- offer holiday deals or seasonal promotions since this cluster tends to spend during the holiday season\n'
+    '\t\t- offer discounts to essential services such as internet subscriptions\n'
+    '\t\t- for the sole person categorized as Generation X in this cluster, offer travel discounts to capitalize on their tendency to spend in the Travel category'
+)
@@ -0,0 +1,55 @@
+# Aggregate cube behind the per-cluster Results charts
+#
+# Every chart on the Results page is an average of `amt` over some of the
+# columns below, so the sum and count of `amt` per combination of them is all
+# the charts need. The cube has at most a few thousand rows regardless of how
+# many transactions there are.
+import numpy as np
+import pandas as pd
+
+CUBE_KEYS = ['labels', 'generation', 'category', 'category_type', 'trans_year', 'trans_month']
+
+
+def build_cube(df):
+    cube = df.groupby(CUBE_KEYS, observed=True)['amt'].agg(['sum', 'count']).reset_index()
+    return cube.rename(columns={'sum': 'amt_sum', 'count': 'amt_count'})
+
+
+def average_amount(cube, index, columns=None):
+    # Mean of `amt` per group, the same values pd.pivot_table(df, values='amt', ...)
+    # gives on the transactions but computed from the partial sums and counts
+    keys = index if isinstance(index, list) else [index]
+    if columns is not None:
+        keys = keys + [columns]
+    totals = cube.groupby(keys, observed=True)[['amt_sum', 'amt_count']].sum()
+    avg = totals['amt_sum'] / totals['amt_count']
+    return avg if columns is None else avg.unstack(columns)
+
+
+def avg_monthly_spending(df):
+    # Average spending per month on physical and digital categories (only the
+    # months with both), from either the transactions or the cube. The month and
+    # the category type are packed into one integer key, so this is a single
+    # grouped pass covering every year in the data; the rows are never sorted,
+    # filtered or copied.
+    category_types = df['category_type'].cat.categories
+    slots = len(category_types) + 1  # slot 0 holds rows without a category type
+    month = (df['trans_year'].to_numpy(dtype=np.int64) - 1970) * 12 + df['trans_month'].to_numpy(dtype=np.int64) - 1
+    key = month * slots + df['category_type'].cat.codes.to_numpy() + 1
+
+    if 'amt_sum' in df:
+        totals = df[['amt_sum', 'amt_count']].groupby(key).sum()
+    else:
+        totals = df['amt'].groupby(key).agg(['sum', 'count'])
+    totals.columns = ['sum', 'count']
+    totals = totals[totals.index % slots > 0]
+
+    # Unpack the key into the month (as a date) and the category type
+    month, type_code = np.divmod(totals.index.to_numpy(), slots)
+    index = pd.MultiIndex.from_arrays([month.astype('datetime64[M]').astype('datetime64[ns]'),
+                                       category_types.take(type_code - 1)],
+                                      names=['date', 'category_type'])
+    avg = pd.Series(totals['sum'].to_numpy() / totals['count'].to_numpy(), index=index).unstack('category_type')
+    avg = avg.reindex(columns=['Physical', 'Digital']).dropna().round()
+    avg.columns.name = None
+    return avg.reset_index()
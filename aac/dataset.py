@@ -0,0 +1,92 @@
+# Labeled transactions as a partitioned Parquet dataset
+#
+# The transactions are written under one directory per year and cluster
+# (trans_year=2021/labels=3/...), sorted by month and category type inside each
+# partition and cut into row groups, so every row group carries min/max
+# statistics for those columns. A read for one cluster or year only opens its
+# partitions, a month or category type filter skips the row groups whose
+# statistics exclude it, and only the requested columns are decoded.
+#
+# The dataset records the version of the transactions it was written from
+# (the key of the loader's columnar files). The loaders read from it only
+# while that is the current version: loader.query_transactions for filtered
+# reads, and the cube and the account store, which only need a few columns.
+#
+#   python -m aac.dataset   # writes TRANSACTIONS_DATASET from TRANSACTIONS_CSV
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from aac.config import TRANSACTIONS_CSV, TRANSACTIONS_DATASET
+from aac.files import atomic_write
+from aac.schema import TRANSACTION_SCHEMA
+
+PARTITION_COLS = ['trans_year', 'labels']
+SORT_COLS = ['trans_month', 'category_type']
+
+# The filters of read_transactions and the columns they apply to
+FILTER_COLS = {'labels': 'labels', 'years': 'trans_year', 'months': 'trans_month',
+               'category_types': 'category_type', 'acct_nums': 'acct_num'}
+
+# Parquet readers skip names starting with '_'
+VERSION_FILE = '_version'
+
+
+def write_transactions_dataset(df, out_dir=TRANSACTIONS_DATASET, row_group_size=64_000, version=None):
+    # Written next to the old dataset and swapped in once complete
+    df = df.sort_values(PARTITION_COLS + SORT_COLS, kind='stable')
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    partitioning = ds.partitioning(table.select(PARTITION_COLS).schema, flavor='hive')
+
+    with atomic_write(out_dir) as tmp_dir:
+        ds.write_dataset(table, tmp_dir, format='parquet', partitioning=partitioning,
+                         max_rows_per_group=row_group_size, min_rows_per_group=min(row_group_size, 8_192),
+                         basename_template='part-{i}.parquet')
+        if version is not None:
+            with open(os.path.join(tmp_dir, VERSION_FILE), 'w') as f:
+                f.write(version)
+
+
+def stored_version(path=TRANSACTIONS_DATASET):
+    # Version of the transactions the dataset was written from (None if unknown or no dataset)
+    try:
+        with open(os.path.join(path, VERSION_FILE)) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def read_transactions(columns=None, labels=None, years=None, months=None, category_types=None, acct_nums=None,
+                      path=TRANSACTIONS_DATASET):
+    # Each filter is a list of accepted values (None: no filter)
+    values = {'labels': labels, 'years': years, 'months': months, 'category_types': category_types,
+              'acct_nums': acct_nums}
+    filters = [(FILTER_COLS[name], 'in', list(accepted)) for name, accepted in values.items() if accepted is not None]
+    df = pd.read_parquet(path, columns=columns, filters=filters or None)
+
+    # Partition values come back as categories of strings or ints, holding
+    # only the values that passed the filters; labels gets back the clusters
+    # of the whole dataset as its categories, as in the loader's frames
+    for col in PARTITION_COLS:
+        if col in df:
+            df[col] = df[col].astype('int64').astype(TRANSACTION_SCHEMA[col])
+    if 'labels' in df:
+        df['labels'] = df['labels'].cat.set_categories(dataset_labels(path))
+    return df
+
+
+def dataset_labels(path=TRANSACTIONS_DATASET):
+    # The clusters present in the dataset, from its directory names only
+    dataset = ds.dataset(path, format='parquet', partitioning=ds.HivePartitioning.discover(infer_dictionary=True))
+    partitioning = dataset.partitioning
+    return sorted(partitioning.dictionaries[partitioning.schema.names.index('labels')].to_pylist())
+
+
+if __name__ == '__main__':
+    from aac.loader import columnar_version, read_transactions_csv
+
+    write_transactions_dataset(read_transactions_csv(TRANSACTIONS_CSV), version=columnar_version(TRANSACTIONS_CSV))
+    files = [os.path.join(root, name) for root, _, names in os.walk(TRANSACTIONS_DATASET) for name in names]
+    print(f"Wrote {len(files)} files ({sum(map(os.path.getsize, files)) / 2**20:.1f} MB) to {TRANSACTIONS_DATASET}")
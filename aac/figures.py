@@ -0,0 +1,145 @@
+# Plotly figures of the dashboard, built once per dataset version
+#
+# The data behind every chart only changes when the dataset files change, so
+# each figure is built once and kept in a bounded LRU cache shared by all
+# sessions of the process (aac/lru.py). The cache is keyed on the dataset
+# version and cleared when a new version is loaded.
+#
+# The cached go.Figure objects are shared between sessions and must not be
+# modified (st.plotly_chart only reads them).
+import plotly.express as px
+import plotly.graph_objects as go
+
+from aac.config import CATEGORY_NAMES, COLORS
+from aac.cube import average_amount, avg_monthly_spending
+from aac.instrument import timed
+from aac.loader import cluster_cube, cluster_users, dataset_version, load_cube, load_users
+from aac.lru import VersionedLRU
+
+
+figure_cache = VersionedLRU(maxsize=128)
+
+
+def get_figure(builder, *args):
+    return figure_cache.get_or_build(dataset_version(), (builder.__name__, *args), lambda: builder(*args))
+
+
+# Bar color of each generation in the per-generation charts, in trace order
+GENERATION_COLORS = {'Silent Generation': COLORS[0], 'Baby Boomers': COLORS[2],
+                     'Generation X': COLORS[1], 'Greatest Generation': 'black',
+                     'Millenials': COLORS[3], 'Generation Z': COLORS[4], 'Generation Alpha': 'grey'}
+
+# The category level chart names a few categories differently from the Methodology page
+CATEGORY_LABELS = {**CATEGORY_NAMES, 'gas_transport': 'Gas Transport'}
+
+
+def _generation_bars(avg, orientation=None):
+    # One bar trace per generation present in the cluster
+    bars = []
+    for generation, color in GENERATION_COLORS.items():
+        if generation not in avg:
+            continue
+        if orientation == 'h':
+            bars.append(go.Bar(name=generation, x=avg[generation], y=avg.index, marker_color=color, orientation='h'))
+        else:
+            bars.append(go.Bar(name=generation, x=avg.index, y=avg[generation], marker_color=color))
+    return bars
+
+
+# Methodology page
+@timed()
+def gender_distribution():
+    gender_count = load_users()['gender'].value_counts().to_frame(name="count").reset_index()
+    return px.bar(gender_count, x='gender', y='count', color='gender')
+
+
+@timed()
+def generation_distribution():
+    generation_count = load_users()['generation'].value_counts().to_frame(name="count").reset_index()
+    generation_count = generation_count[generation_count['count'] > 0]
+    return px.bar(generation_count, x='generation', y='count', color='generation')
+
+
+@timed()
+def top_city_distribution():
+    top_city_count = load_users()['city'].value_counts()[0:5].to_frame(name="count").reset_index()
+    return px.bar(top_city_count, x='city', y='count', color='city')
+
+
+@timed()
+def category_per_trans():
+    cat_trans = load_cube().groupby(['category'], observed=True)['amt_count'].sum().sort_values(ascending=False).to_frame("count").reset_index()
+    cat_trans['category'] = cat_trans['category'].map(CATEGORY_NAMES)
+
+    fig = px.bar(cat_trans, x='count', y='category', color='category',
+                 labels={"count": "Number of Transactions"})
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+@timed()
+def category_per_amt():
+    cat_sum = load_cube().groupby('category', observed=True)['amt_sum'].sum().sort_values(ascending=False).to_frame("total").reset_index()
+    cat_sum['category'] = cat_sum['category'].map(CATEGORY_NAMES)
+
+    fig = px.bar(cat_sum, x='total', y='category', color='category',
+                 labels={"total": "Total Amount Spent"})
+    fig.update_layout(showlegend=False)
+    return fig
+
+
+# Results page (one figure per cluster)
+@timed()
+def cluster_generation_distribution(k):
+    generation_counts = cluster_users(k)['generation'].value_counts()
+    generation_counts = generation_counts[generation_counts > 0]
+    return go.Figure(go.Bar(x=generation_counts.index, y=generation_counts, marker_color=COLORS[2::-1]))
+
+
+@timed()
+def phys_digi_avg_spending_per_gen(k):
+    avg_per_gen_type = average_amount(cluster_cube(k), 'category_type', 'generation')
+
+    # The types in alphabetical order, as the notebook's pivot of the string
+    # column listed them (the categorical dtype orders them Physical, Digital, Others)
+    avg_per_gen_type.index = avg_per_gen_type.index.astype(str)
+    avg_per_gen_type = avg_per_gen_type.sort_index()
+
+    # Turn the values into whole numbers
+    avg_per_gen_type = avg_per_gen_type.round()
+
+    # Add the bar charts (one per generation in the cluster)
+    fig = go.Figure(_generation_bars(avg_per_gen_type))
+    fig.update_layout(barmode='group')
+    return fig
+
+
+@timed()
+def cat_lvl_avg_spending_per_gen(k):
+    avg_per_gen_cat = average_amount(cluster_cube(k), 'category', 'generation')
+
+    # Turn the values into whole numbers
+    avg_per_gen_cat = avg_per_gen_cat.round()
+
+    # Rename the index (category names)
+    avg_per_gen_cat.index = avg_per_gen_cat.index.map(CATEGORY_LABELS)
+
+    # Add the graphs (one per generation in the cluster)
+    fig = go.Figure(_generation_bars(avg_per_gen_cat, orientation='h'))
+    fig.update_layout(barmode='group')
+    return fig
+
+
+@timed()
+def plot_avg_monthly_spending(k):
+    avg_trans = avg_monthly_spending(cluster_cube(k))
+
+    # Plot
+    fig = px.line(avg_trans, x='date', y=['Physical', 'Digital'],
+                  color_discrete_sequence=COLORS,
+                  labels={"variable": "Category Type"}
+                  )
+
+    fig.update_layout(xaxis_title="", yaxis_title="",
+                      plot_bgcolor='white', paper_bgcolor='white')
+    return fig
@@ -0,0 +1,44 @@
+# Writing files and directories that readers only ever see complete
+#
+# Everything the dashboard reads while it is being rewritten (the columnar
+# caches, the published files and their pointer, the models, states and
+# sketches) is written to a temporary path next to its final one and renamed
+# over it once complete. The rename is atomic on the same filesystem, so a
+# reader sees either the old version or the new one, and an interrupted write
+# leaves the old version in place.
+import contextlib
+import os
+import shutil
+
+
+def _remove(path):
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+    elif os.path.lexists(path):
+        os.remove(path)
+
+
+@contextlib.contextmanager
+def atomic_write(path):
+    # Yields the temporary path to write the file (or directory) to, e.g.
+    #   with atomic_write(path) as tmp_path:
+    #       df.to_parquet(tmp_path)
+    # It replaces `path` when the block completes and is deleted if it fails.
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    _remove(tmp_path)
+    try:
+        yield tmp_path
+    except BaseException:
+        _remove(tmp_path)
+        raise
+
+    if os.path.isdir(tmp_path) and os.path.isdir(path):
+        # A directory cannot be renamed over another one: the old one is moved
+        # aside first and deleted after the swap
+        old_path = f'{path}.{os.getpid()}.old'
+        _remove(old_path)
+        os.rename(path, old_path)
+        os.rename(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
+    else:
+        os.replace(tmp_path, path)
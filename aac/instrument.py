@@ -0,0 +1,204 @@
+# Timing of the dashboard's hot paths
+#
+# `section` measures a block (wall time, rows processed and the change in
+# resident memory) and `timed` does the same for a function. Sections nest, so
+# a chart shows up both on its own and inside the expander that draws it.
+#
+# app.py wraps every rerun in `rerun` (`start_run`/`end_run`): the records of a rerun
+# are collected together and then appended to the sinks set in aac.config
+# (a JSONL file with one line per section, and/or a Prometheus text file with
+# running totals per section). Code that runs outside a rerun (the CLIs, the
+# benchmarks) writes its records to the sinks directly.
+#
+# Several server processes share the Prometheus file: each one keeps its own
+# totals next to it (METRICS_PROM.<process>.json) and rewrites the file with
+# the sum over all of them, so the file always covers every process.
+import contextvars
+import functools
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from aac.config import METRICS_JSONL, METRICS_PROM
+from aac.files import atomic_write
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+_run = contextvars.ContextVar('aac_run', default=None)
+_parent = contextvars.ContextVar('aac_section', default=None)
+
+# Running totals per section for the Prometheus file, shared by all sessions
+# of the process; `_process` names the process's totals file
+_totals = {}
+_process = {}
+_lock = threading.Lock()
+
+
+def rss_bytes():
+    # Resident memory of the process (Linux); None where /proc is not available
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class Run:
+    def __init__(self, session=None, page=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.session = session
+        self.page = page
+        self.records = []
+        self.start = time.perf_counter()
+        self.token = None
+
+
+def start_run(session=None, page=None):
+    run = Run(session, page)
+    run.token = _run.set(run)
+    return run
+
+
+def end_run(run):
+    # Records the whole rerun as one more section and flushes the records
+    _record(run, {'section': f'page:{run.page}', 'parent': None,
+                  'seconds': time.perf_counter() - run.start, 'rows': None, 'rss_delta_mb': None})
+    _run.reset(run.token)
+    _write(run.records)
+    return run.records
+
+
+@contextmanager
+def rerun(session=None, page=None):
+    # The run also ends when the block raises or is cut short (st.stop() and
+    # st.rerun() raise too), so its records are never lost and the next run
+    # does not start inside it
+    run = start_run(session, page)
+    try:
+        yield run
+    finally:
+        end_run(run)
+
+
+def _record(run, record):
+    record = {'ts': round(time.time(), 3), 'session': run.session if run else None,
+              'run': run.id if run else None, 'page': run.page if run else None, **record}
+    record['seconds'] = round(record['seconds'], 6)
+    if run is None:
+        _write([record])
+    else:
+        run.records.append(record)
+
+
+@contextmanager
+def section(name, rows=None):
+    # `info` can be updated inside the block, e.g. info['rows'] = len(df)
+    info = {'rows': rows}
+    parent = _parent.get()
+    token = _parent.set(name if parent is None else f'{parent}/{name}')
+    rss_before = rss_bytes()
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        seconds = time.perf_counter() - start
+        rss_after = rss_bytes()
+        _parent.reset(token)
+        delta = None if rss_before is None or rss_after is None else round((rss_after - rss_before) / 2**20, 3)
+        _record(_run.get(), {'section': name, 'parent': parent, 'seconds': seconds,
+                             'rows': info['rows'], 'rss_delta_mb': delta})
+
+
+def timed(name=None):
+    # Decorator form of `section`; the rows are the length of the result when it has one
+    def decorator(func):
+        section_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with section(section_name) as info:
+                result = func(*args, **kwargs)
+                if hasattr(result, '__len__') and not isinstance(result, (str, dict)):
+                    info['rows'] = len(result)
+                return result
+        return wrapper
+    return decorator
+
+
+def _write(records):
+    if METRICS_JSONL:
+        lines = ''.join(json.dumps(record) + '\n' for record in records)
+        with _lock, open(METRICS_JSONL, 'a') as f:
+            f.write(lines)
+    if METRICS_PROM:
+        with _lock:
+            totals_path = _totals_path()
+            for record in records:
+                totals = _totals.setdefault(record['section'], {'calls': 0, 'seconds': 0.0, 'rows': 0})
+                totals['calls'] += 1
+                totals['seconds'] += record['seconds']
+                totals['rows'] += record['rows'] or 0
+            with atomic_write(totals_path) as tmp_path, open(tmp_path, 'w') as f:
+                json.dump(_totals, f)
+            text = prometheus_text(merged_totals())
+            with atomic_write(METRICS_PROM) as tmp_path, open(tmp_path, 'w') as f:
+                f.write(text)
+
+
+def _totals_path():
+    # One file per process, named anew in a forked child (a worker must not
+    # overwrite its parent's totals) and never reused by a later process with
+    # the same pid (the counters would go back)
+    if _process.get('pid') != os.getpid():
+        _totals.clear()
+        _process.update(pid=os.getpid(), name=f'{os.getpid()}-{uuid.uuid4().hex[:8]}')
+    return f"{METRICS_PROM}.{_process['name']}.json"
+
+
+def merged_totals():
+    # Sum of the totals of every process that wrote to METRICS_PROM. Two
+    # processes writing at once may each miss the other's latest records, but
+    # the next write of either includes them again.
+    merged = {}
+    for path in glob.glob(f'{glob.escape(METRICS_PROM)}.*.json'):
+        try:
+            with open(path) as f:
+                totals = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, values in totals.items():
+            merged_values = merged.setdefault(name, {'calls': 0, 'seconds': 0.0, 'rows': 0})
+            for field in merged_values:
+                merged_values[field] += values[field]
+    return merged
+
+
+def prometheus_text(totals):
+    # Text exposition format (e.g. for node_exporter's textfile collector)
+    lines = []
+    for metric, field, help_text in [('aac_section_calls_total', 'calls', 'Times the section ran'),
+                                     ('aac_section_seconds_total', 'seconds', 'Wall time spent in the section'),
+                                     ('aac_section_rows_total', 'rows', 'Rows processed by the section')]:
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} counter']
+        for name, values in sorted(totals.items()):
+            label = name.replace('\\', '\\\\').replace('"', '\\"')
+            lines.append(f'{metric}{{section="{label}"}} {values[field]}')
+    return '\n'.join(lines) + '\n'
+
+
+def slowest_sections(records, n=10):
+    # Calls, total/max seconds, rows and memory per section, slowest first
+    # (pandas is imported here so that the static pages do not load it)
+    import pandas as pd
+
+    if not records:
+        return pd.DataFrame(columns=['calls', 'total_s', 'max_s', 'rows', 'rss_delta_mb'])
+    df = pd.DataFrame(records)
+    summary = df.groupby('section').agg(calls=('seconds', 'size'), total_s=('seconds', 'sum'),
+                                        max_s=('seconds', 'max'), rows=('rows', 'sum'),
+                                        rss_delta_mb=('rss_delta_mb', 'sum'))
+    return summary.sort_values('total_s', ascending=False).head(n)
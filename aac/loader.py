@@ -0,0 +1,271 @@
+# Loading the datasets once per process
+#
+# Streamlit re-executes app.py on every interaction, but imported modules stay
+# loaded, so the frames cached here are parsed once and then shared by every
+# session. The parsed data is also written to a typed Feather file so that a
+# restarted server does not need to parse the CSV again.
+#
+# When a dataset has been published (aac/publish.py), the default loaders map
+# the published Arrow files instead: nothing is parsed, the column data stays
+# in the page cache shared by every server process, and a new version is picked
+# up as soon as the pointer to it is swapped.
+#
+# Otherwise, when the partitioned Parquet dataset (aac/dataset.py) was written
+# from the current transactions, the reads that need some of the rows or
+# columns only go to it: query_transactions pushes its filters down to the
+# partitions and row groups, and the cube and the account store decode only
+# the columns they keep instead of parsing the whole CSV.
+#
+# The loaders return shallow copies of the cached frames. The servers (app.py,
+# aac/api.py) turn on pandas' copy-on-write, so that a session that modifies a
+# frame it received gets its own copy instead of changing the frame shared with
+# the other sessions.
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from aac import dataset
+from aac.config import (CACHE_DIR, PUBLISHED_DIR, PUBLISHED_POINTER,
+                        TRANSACTIONS_CSV, USERS_CSV)
+from aac.cube import CUBE_KEYS, build_cube
+from aac.files import atomic_write
+from aac.instrument import section, timed
+from aac.schema import (SCHEMA_VERSION, TRANSACTION_SCHEMA, USER_SCHEMA,
+                        add_category_type, apply_schema,
+                        category_mapping_hash)
+
+_frames = {}
+_hashes = {}
+_derived = {}
+_pointer = {}
+_lock = threading.RLock()  # reentrant: _load hashes the file while holding it
+
+
+def file_hash(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_users_csv(path=USERS_CSV):
+    return apply_schema(pd.read_csv(path), USER_SCHEMA)
+
+
+def read_transactions_csv(path=TRANSACTIONS_CSV):
+    return add_category_type(apply_schema(pd.read_csv(path), TRANSACTION_SCHEMA))
+
+
+def content_hash(path):
+    # Hash of the file's content, recomputed only when its mtime or size changes
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        if key not in _hashes:
+            for old_key in [k for k in _hashes if k[0] == key[0]]:
+                del _hashes[old_key]
+            _hashes[key] = file_hash(path)
+        return _hashes[key]
+
+
+def columnar_version(path):
+    # Same content, schema and category mapping (category_type is stored with
+    # the data) means the same columnar copy of a CSV, even if it was touched
+    return f'{content_hash(path)[:16]}-v{SCHEMA_VERSION}-{category_mapping_hash()}'
+
+
+def columnar_path(path, name=''):
+    # The columnar file _load keeps the frame `name` derived from `path` in
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f'{stem}{name}-{columnar_version(path)}.feather')
+
+
+def published():
+    # The pointer to the current published dataset, re-read when it is swapped
+    # ({'version': ..., 'files': {'users': ..., ...}}), or None if nothing was published
+    try:
+        stat = os.stat(PUBLISHED_POINTER)
+    except FileNotFoundError:
+        return None
+    key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        if _pointer.get('key') != key:
+            with open(PUBLISHED_POINTER) as f:
+                _pointer.update(key=key, value=json.load(f))
+        return _pointer['value']
+
+
+def csv_version(paths=(USERS_CSV, TRANSACTIONS_CSV)):
+    # Changes whenever one of the CSV files changes
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(content_hash(path).encode())
+    return digest.hexdigest()[:16]
+
+
+def dataset_version():
+    # Version of the data the default loaders return; used to key derived data
+    pointer = published()
+    return csv_version() if pointer is None else pointer['version']
+
+
+def _load(path, name, build):
+    stat = os.stat(path)
+    key = (os.path.abspath(path), name, stat.st_mtime_ns, stat.st_size)
+
+    with _lock:
+        if key not in _frames:
+            cached_path = columnar_path(path, name)
+
+            if os.path.exists(cached_path):
+                with section('read_feather') as info:
+                    df = pd.read_feather(cached_path)
+                    info['rows'] = len(df)
+            else:
+                with section('parse_csv' if not name else f'build{name}') as info:
+                    df = build(path)
+                    info['rows'] = len(df)
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                with atomic_write(cached_path) as tmp_path:
+                    df.to_feather(tmp_path)
+
+            # Drop the frames of older versions of the same file
+            for old_key in [k for k in _frames if k[:2] == key[:2]]:
+                del _frames[old_key]
+            _frames[key] = df
+
+        df = _frames[key]
+
+    # A shallow copy shares the column data (no copy is made until someone writes to it)
+    return df.copy(deep=False)
+
+
+def map_arrow(path):
+    # The columns of an uncompressed Arrow file with one record batch, read in
+    # place: numeric and datetime columns and the string buffers point into the
+    # mapped file, only the categorical codes are copied
+    table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+    return table.to_pandas(split_blocks=True, types_mapper={pa.string(): pd.StringDtype('pyarrow')}.get)
+
+
+def _load_published(pointer, name):
+    key = ('published', name, pointer['version'])
+    with _lock:
+        if key not in _frames:
+            with section('map_arrow') as info:
+                df = map_arrow(os.path.join(PUBLISHED_DIR, pointer['files'][name]))
+                info['rows'] = len(df)
+            for old_key in [k for k in _frames if k[:2] == key[:2]]:
+                del _frames[old_key]
+            _frames[key] = df
+        df = _frames[key]
+    return df.copy(deep=False)
+
+
+def clear_memory_cache():
+    # Forget the loaded frames (the columnar files on disk are kept)
+    with _lock:
+        _frames.clear()
+        _hashes.clear()
+        _derived.clear()
+        _pointer.clear()
+
+
+@timed()
+def load_users(path=USERS_CSV):
+    pointer = published() if path == USERS_CSV else None
+    if pointer is not None:
+        return _load_published(pointer, 'users')
+    return _load(path, '', read_users_csv)
+
+
+@timed()
+def load_transactions(path=TRANSACTIONS_CSV):
+    pointer = published() if path == TRANSACTIONS_CSV else None
+    if pointer is not None:
+        return _load_published(pointer, 'transactions')
+    return _load(path, '', read_transactions_csv)
+
+
+def reads_dataset(path=TRANSACTIONS_CSV):
+    # Whether the transactions of `path` can be read from the partitioned
+    # dataset: nothing is published and it was written from this version
+    return (path == TRANSACTIONS_CSV and published() is None and os.path.exists(path)
+            and dataset.stored_version() == columnar_version(path))
+
+
+@timed()
+def query_transactions(columns=None, labels=None, years=None, months=None, category_types=None, acct_nums=None):
+    # The transactions passing the filters (lists of accepted values, None: no
+    # filter), with only `columns` (None: all of them). Read from the
+    # partitioned dataset when it is current, otherwise filtered from the
+    # loaded (or published) frame.
+    filters = {'labels': labels, 'years': years, 'months': months, 'category_types': category_types,
+               'acct_nums': acct_nums}
+    if reads_dataset():
+        with section('read_dataset') as info:
+            df = dataset.read_transactions(columns, **filters)
+            info['rows'] = len(df)
+        return df
+
+    df = load_transactions()
+    keep = np.ones(len(df), dtype=bool)
+    for name, accepted in filters.items():
+        if accepted is not None:
+            keep &= df[dataset.FILTER_COLS[name]].isin(list(accepted)).to_numpy()
+    df = df if keep.all() else df[keep]
+    return df if columns is None else df[columns]
+
+
+def _build_cube(path):
+    # Only the cube's columns are decoded when they come from the dataset.
+    # The transactions are not kept in memory either way, so pages that only
+    # need the cube never hold the full frame.
+    if reads_dataset(path):
+        return build_cube(dataset.read_transactions(CUBE_KEYS + ['amt']))
+    return build_cube(read_transactions_csv(path))
+
+
+@timed()
+def load_cube(path=TRANSACTIONS_CSV):
+    # The aggregate cube is derived from the transactions file, so it shares its
+    # version key and is rebuilt only when the transactions change
+    pointer = published() if path == TRANSACTIONS_CSV else None
+    if pointer is not None:
+        return _load_published(pointer, 'cube')
+    return _load(path, '-cube', _build_cube)
+
+
+def derived(name, build):
+    # Small results computed from the loaded frames (splits, summary tables),
+    # built once per dataset version and shared like the frames themselves
+    key = (name, dataset_version())
+    with _lock:
+        if key not in _derived:
+            for old_key in [k for k in _derived if k[0] == name]:
+                del _derived[old_key]
+            _derived[key] = build()
+        return _derived[key]
+
+
+def cluster_groups(load):
+    # The frame returned by `load` (load_users or load_cube) split by cluster in
+    # one pass: {label: rows of that cluster}
+    return derived(f'{load.__name__}-by-cluster',
+                   lambda: dict(tuple(load().groupby('labels', observed=True))))
+
+
+def cluster_users(k):
+    users = cluster_groups(load_users)
+    return users[k] if k in users else load_users().iloc[:0]
+
+
+def cluster_cube(k):
+    cube = cluster_groups(load_cube)
+    return cube[k] if k in cube else load_cube().iloc[:0]
@@ -0,0 +1,42 @@
+# Bounded LRU cache of values derived from one dataset version
+#
+# Used for the dashboard figures (aac/figures.py) and the API responses
+# (aac/api.py). The cache holds the values of a single dataset version: it is
+# cleared when a newer version is asked for, and a value computed for a
+# version that was replaced in the meantime is returned but not stored.
+import threading
+from collections import OrderedDict
+
+
+class VersionedLRU:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version, key):
+        # The cached value, or None
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        return None
+
+    def put(self, version, key, value):
+        with self._lock:
+            if version == self.version:
+                self._entries[key] = value
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def get_or_build(self, version, key, build):
+        value = self.get(version, key)
+        if value is None:
+            # Built outside the lock so that a slow value does not block the others
+            value = self.put(version, key, build())
+        return value
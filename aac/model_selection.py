@@ -0,0 +1,94 @@
+# Choosing the number of clusters
+#
+# The notebook's optimize_kmeans, with every k fitted in its own process and
+# the silhouette estimated on a fixed-seed sample of the accounts (the exact
+# silhouette is quadratic in the number of accounts). The report has the
+# inertia, silhouette and fitting time for each k and marks the elbow.
+#
+#   python -m aac.model_selection [--exact] [--workers N] [--sample-size N]
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+from threadpoolctl import threadpool_limits
+
+from aac.config import REFERENCE_DATE
+
+_scaled_data = None
+
+
+def run_kmeans(k, scaled_data, random_state=42):
+    # Same settings as the notebook
+    kmeans = KMeans(init='random', n_clusters=k, n_init=10,
+                    max_iter=300, random_state=random_state)
+    kmeans.fit(scaled_data)
+    return kmeans.inertia_, kmeans.labels_
+
+
+def _init_worker(scaled_data):
+    # The data is sent once per worker instead of once per k, and each worker
+    # uses one thread so that the processes do not compete for the same cores
+    global _scaled_data
+    _scaled_data = scaled_data
+    threadpool_limits(1)
+
+
+def _evaluate(k, sample_size, random_state):
+    start = time.perf_counter()
+    inertia, labels = run_kmeans(k, _scaled_data, random_state)
+    fit_time = time.perf_counter() - start
+
+    if sample_size is not None and sample_size >= len(_scaled_data):
+        sample_size = None
+    silhouette = silhouette_score(_scaled_data, labels, sample_size=sample_size, random_state=random_state)
+    return {'k': k, 'inertia': inertia, 'silhouette': silhouette,
+            'fit_time': fit_time, 'wall_time': time.perf_counter() - start}
+
+
+def elbow_k(cluster_range, inertias):
+    # Getting optimal k based on derivatives (as in the notebook)
+    second_deriv = np.diff(np.diff(inertias))
+    return cluster_range[np.argmax(second_deriv) + 1]
+
+
+def sweep_k(scaled_data, cluster_range=range(2, 11), sample_size=10_000, exact=False,
+            workers=None, random_state=42):
+    cluster_range = list(cluster_range)
+    sample_size = None if exact else sample_size
+    scaled_data = np.ascontiguousarray(scaled_data, dtype=float)
+
+    with ProcessPoolExecutor(max_workers=workers or min(len(cluster_range), os.cpu_count()),
+                             initializer=_init_worker, initargs=(scaled_data,)) as pool:
+        results = list(pool.map(_evaluate, cluster_range,
+                                [sample_size] * len(cluster_range),
+                                [random_state] * len(cluster_range)))
+
+    report = pd.DataFrame(results).set_index('k')
+    report['elbow'] = report.index == elbow_k(cluster_range, report['inertia'].to_numpy())
+    return report
+
+
+if __name__ == '__main__':
+    from aac.clustering import FEATURES
+    from aac.rfm import load_rfm_state, rfm_from_state
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--exact', action='store_true', help='exact silhouette over all accounts')
+    parser.add_argument('--sample-size', type=int, default=10_000)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    rfm = rfm_from_state(load_rfm_state(), REFERENCE_DATE)
+    scaled_data = StandardScaler().fit_transform(rfm[FEATURES])
+
+    start = time.perf_counter()
+    report = sweep_k(scaled_data, sample_size=args.sample_size, exact=args.exact, workers=args.workers)
+    print(report.to_string())
+    print(f"Ideal number of clusters: {report.index[report['elbow']][0]} "
+          f"({time.perf_counter() - start:.1f}s in total)")
@@ -0,0 +1,150 @@
+# Map-reduce aggregation over a process pool
+#
+# The rows are hash-partitioned by acct_num; each worker groups one partition
+# at a time and returns partial results (sum, count, min and max per group),
+# and the reduce step merges them: sums and counts add up, minima and maxima
+# take the min and max again, and a mean is carried as a sum and a count and
+# divided after the merge. Groups keyed by acct_num never span two
+# partitions, so the per-account groupbys (RFM) are merged by concatenation
+# and can also take the first or last value of a column.
+#
+# With the fork start method (Linux), the workers inherit the frame and the
+# partition index from the parent, so no rows are pickled; elsewhere each
+# worker is sent the rows of its partition. Only the partial results travel
+# back to the parent.
+#
+#   python -m aac.parallel [--workers 8]   # RFM, category totals and counts of the transactions
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from aac.config import REFERENCE_DATE
+
+PARTITION_KEY = 'acct_num'
+
+# How each partial result is merged
+MERGE = {'sum': 'sum', 'count': 'sum', 'size': 'sum', 'min': 'min', 'max': 'max'}
+# Only exact when the groups do not span partitions (acct_num is a key)
+PER_PARTITION = ['first', 'last']
+
+_job = {}  # set in the parent before forking the workers
+
+
+def partition(df, partitions, key=PARTITION_KEY):
+    # Row positions grouped by partition (in their original order inside
+    # each partition), and where each partition starts: the rows of
+    # partition i are order[offsets[i]:offsets[i + 1]]. Stable argsorts of
+    # 16-bit integers are radix sorts, so this is linear in the rows.
+    if partitions > np.iinfo(np.int16).max:
+        raise ValueError(f'at most {np.iinfo(np.int16).max} partitions')
+    part = (pd.util.hash_array(df[key].to_numpy()) % partitions).astype(np.int16)
+    order = np.argsort(part, kind='stable')
+    offsets = np.searchsorted(part[order], np.arange(partitions + 1))
+    return order, offsets
+
+
+def _plan(aggs, disjoint):
+    # Partial aggregations computed by the workers, as named aggregations
+    spec = {}
+    for name, (col, func) in aggs.items():
+        if func == 'mean':
+            spec[f'{name}__sum'] = (col, 'sum')
+            spec[f'{name}__count'] = (col, 'count')
+        elif func in MERGE or (disjoint and func in PER_PARTITION):
+            spec[name] = (col, func)
+        else:
+            raise ValueError(f"cannot merge '{func}' across partitions"
+                             + ('' if func in PER_PARTITION else f" (supported: {', '.join([*MERGE, 'mean'])})"))
+    return spec
+
+
+def _partial(df, by, spec):
+    return df.groupby(by, observed=True, sort=False).agg(**spec)
+
+
+def _map_shared(i):
+    df, order, offsets, by, spec = _job['args']
+    return _partial(df.take(order[offsets[i]:offsets[i + 1]]), by, spec)
+
+
+def _reduce(partials, by, aggs, spec, disjoint):
+    merged = pd.concat(partials)
+    if not disjoint:
+        merged = merged.groupby(level=by, observed=True).agg(
+            {name: MERGE[func] for name, (_, func) in spec.items()})
+    result = pd.DataFrame(index=merged.index)
+    for name, (_, func) in aggs.items():
+        result[name] = merged[f'{name}__sum'] / merged[f'{name}__count'] if func == 'mean' else merged[name]
+    return result.sort_index()
+
+
+def aggregate(df, by, workers=None, partitions=None, key=PARTITION_KEY, **aggs):
+    # Same result as df.groupby(by, observed=True).agg(**aggs), e.g.
+    #   aggregate(df, 'category', workers=8, total=('amt', 'sum'), avg=('amt', 'mean'))
+    by = [by] if isinstance(by, str) else list(by)
+    workers = workers or os.cpu_count() or 1
+    # Several partitions per worker, so that the workers finish together
+    partitions = partitions or (1 if workers == 1 else workers * 4)
+    disjoint = key in by
+    spec = _plan(aggs, disjoint)
+
+    columns = list(dict.fromkeys(by + [col for col, _ in aggs.values()]))
+    if partitions == 1:
+        return _reduce([_partial(df[columns], by, spec)], by, aggs, spec, disjoint)
+    order, offsets = partition(df, partitions, key)
+    df = df[columns]
+
+    if workers == 1:
+        partials = [_partial(df.take(order[offsets[i]:offsets[i + 1]]), by, spec) for i in range(partitions)]
+    elif 'fork' in multiprocessing.get_all_start_methods():
+        _job['args'] = (df, order, offsets, by, spec)
+        try:
+            with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork')) as pool:
+                partials = list(pool.map(_map_shared, range(partitions)))
+        finally:
+            _job.clear()
+    else:
+        chunks = [df.take(order[offsets[i]:offsets[i + 1]]) for i in range(partitions)]
+        with ProcessPoolExecutor(workers) as pool:
+            partials = list(pool.map(_partial, chunks, [by] * partitions, [spec] * partitions))
+    return _reduce(partials, by, aggs, spec, disjoint)
+
+
+def rfm(df, reference_date=REFERENCE_DATE, workers=None):
+    # The notebook's RFM groupbys on ['acct_num', 'age', 'gender']; recency is
+    # the days from the last transaction to the reference date
+    result = aggregate(df, ['acct_num', 'age', 'gender'], workers, last_trans=('trans_datetime', 'max'),
+                       freq=('amt', 'size'), mv=('amt', 'sum'))
+    result.insert(0, 'recency', (pd.Timestamp(reference_date) - result.pop('last_trans')).dt.days)
+    return result.reset_index()
+
+
+def value_counts(df, col, workers=None):
+    # df[col].value_counts()
+    counts = aggregate(df, col, workers, count=(col, 'count'))['count']
+    return counts.sort_values(ascending=False, kind='stable').rename('count')
+
+
+def pivot_table(df, values, index, columns, aggfunc='mean', workers=None):
+    # pd.pivot_table(df, values=values, index=index, columns=columns, aggfunc=aggfunc)
+    index = [index] if isinstance(index, str) else list(index)
+    columns = [columns] if isinstance(columns, str) else list(columns)
+    result = aggregate(df, index + columns, workers, **{values: (values, aggfunc)})[values]
+    return result.unstack(columns)
+
+
+if __name__ == '__main__':
+    from aac.loader import load_transactions
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=None, help='processes (default: one per core)')
+    args = parser.parse_args()
+
+    df = load_transactions()
+    print(rfm(df, workers=args.workers).head(10).to_string(), end='\n\n')
+    print(aggregate(df, 'category', args.workers, amt=('amt', 'sum')).to_string(), end='\n\n')
+    print(value_counts(df, 'generation', args.workers).to_string())
@@ -0,0 +1,262 @@
+# The segmentation pipeline, from cc_dirty.csv to the dashboard CSVs
+#
+# The notebook's steps as explicit stages:
+#
+#   clean   raw CSV -> cleaned Parquet dataset and summary sketches  (reference_date)
+#   rfm     clean -> RFM per account                                 (reference_date)
+#   scale   rfm -> standardized RFM matrix                           (only to pick k)
+#   sweep   scale -> inertia and silhouette per k, elbow             (k_range, random_state; only to pick k)
+#   label   rfm, reference model [, sweep] -> cluster per account    (k, random_state)
+#   export  clean, rfm, label -> s1_users_csv.csv and s1_final_csv.csv
+#   cube    export -> category_type, then amount sums and counts     (physical_cats, digital_cats)
+#
+# The accounts are labelled like `python -m aac.clustering refit`, except that
+# the model is always refitted from the reference model (CLUSTER_REFERENCE)
+# and its clusters matched to the reference's, so that a cluster keeps the id
+# the dashboard describes it under (aac/clusters.py). The refitted model is
+# exported to CLUSTER_MODEL, never over the reference, so an export does not
+# change the inputs of the next run.
+#
+# Each stage's output is kept in PIPELINE_CACHE under a key hashed from the
+# stage, its parameters and the content hashes of its inputs (the raw file and
+# the reference model, or the outputs of the stages it reads). A stage whose key
+# is already cached is skipped, so changing k only reruns label, export and
+# cube, and changing the category mapping only reruns cube. Since the keys use
+# output content hashes, a rerun stage that produces the same output as before
+# does not invalidate the stages after it.
+#
+# The outputs stay in the cache unless --export is given, which copies the
+# CSVs, the sketches and the refitted cluster model to where the dashboard
+# reads them. The cube is exported into the loader's columnar cache when its
+# mapping is the one the dashboard uses (PHYSICAL_CATS and DIGITAL_CATS), so
+# the dashboard does not build it again.
+#
+#   python -m aac.pipeline [--raw cc_dirty.csv] [--k 6 | --k elbow] [--k-range 2 10]
+#                          [--physical-cats ...] [--digital-cats ...] [--export]
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from aac import instrument
+from aac.config import (CLUSTER_MODEL, CLUSTER_REFERENCE, DIGITAL_CATS,
+                        PHYSICAL_CATS, PIPELINE_CACHE, RAW_CSV, REFERENCE_DATE,
+                        SKETCHES, TRANSACTIONS_CSV, USERS_CSV)
+from aac.files import atomic_write
+from aac.loader import columnar_path, content_hash, file_hash
+
+# Bump when a stage's code changes what it writes, so that old outputs are not reused
+PIPELINE_VERSION = 3
+
+USER_COLUMNS = ['gender', 'city', 'city_pop', 'job', 'dob', 'acct_num', 'acct_num2', 'trans_dob', 'age', 'generation']
+TRANSACTION_COLUMNS = ['cc_num', 'acct_num', 'trans_num', 'unix_time', 'category', 'amt', 'gender', 'city',
+                       'city_pop', 'job', 'dob', 'acct_num2', 'trans_datetime', 'trans_dob', 'age', 'generation',
+                       'trans_hour', 'trans_month', 'trans_year', 'elapsed_days']
+
+
+class Stages:
+    # Runs the stages through the cache and records what each one did
+    def __init__(self, cache_dir=PIPELINE_CACHE):
+        self.cache_dir = cache_dir
+        self.report = []
+
+    def run(self, name, build, inputs=(), **params):
+        # `inputs` are (name, content hash, path) of what the stage reads;
+        # build(out_dir, *input paths, **params) writes the output into out_dir.
+        # Returns (content hash, path) of the output.
+        key = hashlib.sha256(json.dumps({'stage': name, 'version': PIPELINE_VERSION, 'params': params,
+                                         'inputs': {input_name: digest for input_name, digest, _ in inputs}},
+                                        sort_keys=True, default=str).encode()).hexdigest()
+        path = os.path.join(self.cache_dir, f'{name}-{key[:16]}')
+        meta_path = os.path.join(path, 'meta.json')
+
+        start = time.perf_counter()
+        with instrument.section(f'pipeline:{name}'):
+            if os.path.exists(meta_path):
+                status = 'hit'
+                with open(meta_path) as f:
+                    meta = json.load(f)
+            else:
+                status = 'miss'
+                meta = self._build(name, build, inputs, params, key, path)
+
+        self.report.append({'stage': name, 'cache': status, 'seconds': round(time.perf_counter() - start, 3),
+                            'key': key[:16]})
+        return meta['output_hash'], path
+
+    def _build(self, name, build, inputs, params, key, path):
+        # Written next to its final place and renamed once complete, so an
+        # interrupted run never leaves a partial output behind a valid key
+        with atomic_write(path) as tmp_path:
+            os.makedirs(tmp_path)
+            build(tmp_path, *[input_path for _, _, input_path in inputs], **params)
+
+            meta = {'stage': name, 'key': key, 'params': params, 'output_hash': _dir_hash(tmp_path),
+                    'inputs': {input_name: digest for input_name, digest, _ in inputs},
+                    'created': time.strftime('%Y-%m-%dT%H:%M:%S')}
+            with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+                json.dump(meta, f, indent=2, default=str)
+        return meta
+
+
+def _dir_hash(path):
+    # Content hash of every file under path (names included)
+    digest = hashlib.sha256()
+    for root, dirs, names in os.walk(path):
+        dirs.sort()
+        for name in sorted(names):
+            file_path = os.path.join(root, name)
+            digest.update(os.path.relpath(file_path, path).encode())
+            digest.update(file_hash(file_path).encode())
+    return digest.hexdigest()
+
+
+def build_clean(out_dir, raw_path, reference_date):
+    from aac.preprocessing import preprocess
+    from aac.sketches import Summary, save_summary
+
+    summary = Summary()
+    stats = preprocess(raw_path, os.path.join(out_dir, 'clean'), reference_date=reference_date, summary=summary)
+    save_summary(summary, os.path.join(out_dir, 'sketches.json'))
+    with open(os.path.join(out_dir, 'stats.json'), 'w') as f:
+        json.dump(stats, f)
+
+
+def build_rfm(out_dir, clean_dir, reference_date):
+    from aac.preprocessing import read_clean
+    from aac.rfm import compute_rfm
+
+    df = read_clean(os.path.join(clean_dir, 'clean'), columns=['acct_num', 'age', 'gender', 'trans_datetime', 'amt'])
+    compute_rfm(df, reference_date).to_parquet(os.path.join(out_dir, 'rfm.parquet'), index=False)
+
+
+def build_scale(out_dir, rfm_dir):
+    from sklearn.preprocessing import StandardScaler
+
+    from aac.clustering import FEATURES
+
+    rfm = pd.read_parquet(os.path.join(rfm_dir, 'rfm.parquet'), columns=FEATURES)
+    np.save(os.path.join(out_dir, 'scaled.npy'), StandardScaler().fit_transform(rfm))
+
+
+def build_sweep(out_dir, scale_dir, k_range, random_state, sample_size):
+    from aac.model_selection import sweep_k
+
+    scaled = np.load(os.path.join(scale_dir, 'scaled.npy'))
+    report = sweep_k(scaled, range(k_range[0], k_range[1] + 1), sample_size=sample_size, random_state=random_state)
+    report.to_csv(os.path.join(out_dir, 'sweep.csv'))
+
+
+def build_label(out_dir, rfm_dir, reference_path, sweep_dir=None, k=6, random_state=42):
+    # Refit from the reference model, with the cluster ids matched to its ids
+    from aac.clustering import assign_clusters, fit_clusters, iter_batches, load_model, save_model
+
+    if k is None:  # the elbow of the sweep
+        report = pd.read_csv(os.path.join(sweep_dir, 'sweep.csv'), index_col='k')
+        k = int(report.index[report['elbow']][0])
+    rfm = pd.read_parquet(os.path.join(rfm_dir, 'rfm.parquet'))
+    if k > len(rfm):
+        raise ValueError(f'cannot make {k} clusters of {len(rfm)} accounts')
+
+    model = fit_clusters(lambda: iter_batches(rfm), k, load_model(reference_path), random_state=random_state)
+    save_model(model, os.path.join(out_dir, 'cluster_model.json'))
+    labels = np.concatenate([assign_clusters(model, X) for X in iter_batches(rfm)])
+    rfm[['acct_num']].assign(labels=labels).to_parquet(os.path.join(out_dir, 'labels.parquet'), index=False)
+
+
+def build_export(out_dir, clean_dir, rfm_dir, label_dir):
+    # The two CSVs in the format of the notebook's exports
+    from aac.preprocessing import read_clean
+
+    df = read_clean(os.path.join(clean_dir, 'clean'))
+    rfm = pd.read_parquet(os.path.join(rfm_dir, 'rfm.parquet'), columns=['acct_num', 'recency', 'freq', 'mv'])
+    rfm = rfm.merge(pd.read_parquet(os.path.join(label_dir, 'labels.parquet')), on='acct_num')
+    users = df.drop_duplicates(subset=['acct_num'])[USER_COLUMNS].merge(rfm, on='acct_num')
+    users.to_csv(os.path.join(out_dir, 'users.csv'), index=False)
+    df[TRANSACTION_COLUMNS].merge(rfm, on='acct_num').to_csv(os.path.join(out_dir, 'transactions.csv'), index=False)
+
+
+def build_cube(out_dir, export_dir, physical_cats, digital_cats):
+    from aac.cube import build_cube as cube_of
+    from aac.schema import TRANSACTION_SCHEMA, add_category_type, apply_schema
+
+    df = apply_schema(pd.read_csv(os.path.join(export_dir, 'transactions.csv')), TRANSACTION_SCHEMA)
+    # Feather, like the loader's columnar files, which keeps the categorical labels
+    cube_of(add_category_type(df, physical_cats, digital_cats)).to_feather(os.path.join(out_dir, 'cube.feather'))
+
+
+def run_pipeline(raw_path=RAW_CSV, reference_date=REFERENCE_DATE, k=6, k_range=(2, 10), random_state=42,
+                 sample_size=10_000, reference_path=CLUSTER_REFERENCE, model_path=CLUSTER_MODEL,
+                 physical_cats=PHYSICAL_CATS, digital_cats=DIGITAL_CATS, cache_dir=PIPELINE_CACHE, export=False):
+    # k=None labels with the elbow of the sweep; the scale and sweep stages
+    # only run then. Returns the output directory of each stage that ran and
+    # the report of the stages (cache hit or miss, seconds, key).
+    stages = Stages(cache_dir)
+    reference_date = str(pd.Timestamp(reference_date).date())
+    reference_hash = content_hash(reference_path) if os.path.exists(reference_path) else None
+
+    paths = {}
+    clean = stages.run('clean', build_clean, [('raw', content_hash(raw_path), raw_path)],
+                       reference_date=reference_date)
+    rfm = stages.run('rfm', build_rfm, [('clean', *clean)], reference_date=reference_date)
+    label_inputs = [('rfm', *rfm), ('reference', reference_hash, reference_path)]
+    if k is None:
+        scale = stages.run('scale', build_scale, [('rfm', *rfm)])
+        sweep = stages.run('sweep', build_sweep, [('scale', *scale)], k_range=list(k_range),
+                           random_state=random_state, sample_size=sample_size)
+        label_inputs.append(('sweep', *sweep))
+        paths.update(scale=scale[1], sweep=sweep[1])
+    label = stages.run('label', build_label, label_inputs, k=k, random_state=random_state)
+    exported = stages.run('export', build_export, [('clean', *clean), ('rfm', *rfm), ('label', *label)])
+    cube = stages.run('cube', build_cube, [('export', *exported)],
+                      physical_cats=sorted(physical_cats), digital_cats=sorted(digital_cats))
+    paths.update(clean=clean[1], rfm=rfm[1], label=label[1], export=exported[1], cube=cube[1])
+
+    if export:
+        for source, target in [(os.path.join(exported[1], 'users.csv'), USERS_CSV),
+                               (os.path.join(exported[1], 'transactions.csv'), TRANSACTIONS_CSV),
+                               (os.path.join(clean[1], 'sketches.json'), SKETCHES),
+                               (os.path.join(label[1], 'cluster_model.json'), model_path)]:
+            with atomic_write(target) as tmp_path:
+                shutil.copyfile(source, tmp_path)
+
+        # Keyed on the exported transactions, so written once they are in place
+        if (sorted(physical_cats), sorted(digital_cats)) == (sorted(PHYSICAL_CATS), sorted(DIGITAL_CATS)):
+            target = columnar_path(TRANSACTIONS_CSV, '-cube')
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with atomic_write(target) as tmp_path:
+                shutil.copyfile(os.path.join(cube[1], 'cube.feather'), tmp_path)
+
+    return paths, pd.DataFrame(stages.report).set_index('stage')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--raw', default=RAW_CSV)
+    parser.add_argument('--reference-date', default=REFERENCE_DATE)
+    parser.add_argument('--k', default='6', help="number of clusters, or 'elbow' for the sweep's elbow")
+    parser.add_argument('--k-range', type=int, nargs=2, default=[2, 10], metavar=('MIN', 'MAX'),
+                        help='k swept for the elbow')
+    parser.add_argument('--random-state', type=int, default=42)
+    parser.add_argument('--sample-size', type=int, default=10_000, help='accounts sampled for the silhouette')
+    parser.add_argument('--reference', default=CLUSTER_REFERENCE, help='cluster model the ids are matched to')
+    parser.add_argument('--model', default=CLUSTER_MODEL, help='where --export writes the refitted cluster model')
+    parser.add_argument('--physical-cats', nargs='*', default=PHYSICAL_CATS)
+    parser.add_argument('--digital-cats', nargs='*', default=DIGITAL_CATS)
+    parser.add_argument('--cache-dir', default=PIPELINE_CACHE)
+    parser.add_argument('--export', action='store_true',
+                        help='replace the dashboard CSVs, the sketches and the cluster model with the outputs')
+    args = parser.parse_args()
+
+    paths, report = run_pipeline(args.raw, args.reference_date, None if args.k == 'elbow' else int(args.k),
+                                 args.k_range, args.random_state, args.sample_size, args.reference,
+                                 args.model, args.physical_cats, args.digital_cats, args.cache_dir, export=args.export)
+    print(report.to_string())
+    print(f"\n{(report['cache'] == 'hit').sum()} of {len(report)} stages cached, "
+          f"{report['seconds'].sum():.1f}s in total; outputs in {args.cache_dir}"
+          + ('' if args.export else ' (not exported, see --export)'))
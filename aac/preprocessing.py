@@ -0,0 +1,135 @@
+# Cleaning the raw transactions (cc_dirty.csv) in bounded memory
+#
+# These are the preprocessing steps of the notebook, applied to one chunk of
+# the raw file at a time so that dumps larger than RAM can be cleaned. Each
+# cleaned chunk is appended to a Parquet dataset partitioned by trans_year,
+# and added to the summary sketches (aac/sketches.py) in the same pass.
+#
+# The dataset is written next to the output directory and renamed over it once
+# complete, with a marker file holding the counts of the run. An existing
+# output directory is only replaced if it has that marker, so pointing the
+# output at a directory holding anything else (e.g. data/) fails instead of
+# deleting it.
+#
+#   python -m aac.preprocessing [cc_dirty.csv] [data/clean]
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from aac.config import (CLEAN_DIR, GENERATION_BINS, GENERATIONS, RAW_CSV,
+                        REFERENCE_DATE)
+from aac.files import atomic_write
+
+# Fixed dtypes so that the same raw row parses (and hashes) the same way in every chunk
+RAW_DTYPES = {'cc_num': 'int64', 'gender': 'object', 'city': 'object', 'city_pop': 'object',
+              'job': 'object', 'dob': 'object', 'acct_num': 'float64', 'acct_num2': 'int64',
+              'trans_num': 'object', 'unix_time': 'int64', 'category': 'object', 'amt': 'object'}
+
+GENDERS = {"Male": "M", "Female": "F", "M": "M", "F": "F"}
+
+# Written into every complete output; Parquet readers skip names starting with '_'
+MARKER = '_preprocessed.json'
+
+
+def read_raw(path=RAW_CSV, chunksize=None, nrows=None):
+    return pd.read_csv(path, dtype=RAW_DTYPES, chunksize=chunksize, nrows=nrows)
+
+
+def drop_seen(chunk, seen):
+    # Drop the rows already seen in this chunk or an earlier one. Rows are
+    # identified by a 64-bit hash of all their values, so memory grows with
+    # the number of distinct rows (one Python int per row) rather than their size.
+    hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+    keep = ~pd.Series(hashes).duplicated().to_numpy()
+    keep[keep] = [h not in seen for h in hashes[keep].tolist()]
+    seen.update(hashes[keep].tolist())
+    return chunk[keep]
+
+
+def clean_chunk(df, reference_date=REFERENCE_DATE):
+    df['category'] = df['category'].fillna('no_category')
+    df['gender'] = df['gender'].map(GENDERS)
+    df['amt'] = df['amt'].str.replace('$', '', regex=False).astype(float)
+    df['city_pop'] = (df['city_pop'].str.replace('people', '', regex=False)
+                      .str.replace(',', '', regex=False).str.strip().astype(int))
+
+    # unix_time is in whole seconds, so the naive datetime is the same as the
+    # notebook's UTC -> strftime -> to_datetime round-trip
+    df['trans_datetime'] = pd.to_datetime(df['unix_time'], unit='s')
+    df['trans_dob'] = pd.to_datetime(df['dob'], format='%d/%m/%Y')
+
+    reference = pd.Timestamp(reference_date)
+    df['age'] = (reference - df['trans_dob']) // pd.Timedelta(days=365.25)
+    df['generation'] = pd.cut(df['trans_dob'].dt.year, bins=GENERATION_BINS,
+                              right=True, labels=GENERATIONS)
+
+    df['trans_hour'] = df['trans_datetime'].dt.hour
+    df['trans_month'] = df['trans_datetime'].dt.month
+    df['trans_year'] = df['trans_datetime'].dt.year
+    df['elapsed_days'] = (reference - df['trans_datetime']).dt.days
+    return df
+
+
+def preprocess(raw_path=RAW_CSV, out_dir=CLEAN_DIR, chunksize=500_000, reference_date=REFERENCE_DATE,
+               summary=None):
+    # Replace any earlier output with the cleaned chunks, appended one by one
+    if os.path.isdir(out_dir) and os.listdir(out_dir) and not os.path.exists(os.path.join(out_dir, MARKER)):
+        raise ValueError(f'{out_dir} is not empty and was not written by aac.preprocessing, not replacing it')
+
+    stats = {'rows_read': 0, 'null_job': 0, 'duplicates': 0, 'rows_written': 0}
+    seen = set()
+
+    with atomic_write(out_dir) as tmp_dir:
+        os.makedirs(tmp_dir)
+        for i, chunk in enumerate(read_raw(raw_path, chunksize=chunksize)):
+            rows = len(chunk)
+            stats['rows_read'] += rows
+
+            # Remove rows with null job values (or acct num) and duplicates
+            chunk = chunk[chunk['job'].notna()]
+            stats['null_job'] += rows - len(chunk)
+            deduplicated = drop_seen(chunk, seen)
+            stats['duplicates'] += len(chunk) - len(deduplicated)
+
+            if deduplicated.empty:
+                continue
+            cleaned = clean_chunk(deduplicated.copy(), reference_date)
+            cleaned.to_parquet(tmp_dir, partition_cols=['trans_year'], index=False,
+                               basename_template=f'part-{i:05d}-{{i}}.parquet')
+            stats['rows_written'] += len(cleaned)
+            if summary is not None:
+                summary.update(cleaned)
+
+        with open(os.path.join(tmp_dir, MARKER), 'w') as f:
+            json.dump({'reference_date': str(reference_date), **stats}, f)
+
+    return stats
+
+
+def read_clean(out_dir=CLEAN_DIR, columns=None):
+    df = pd.read_parquet(out_dir, columns=columns)
+    if 'trans_year' in df:
+        df['trans_year'] = df['trans_year'].astype(np.int64)  # partition values come back as categories
+    return df
+
+
+if __name__ == '__main__':
+    from aac.config import SKETCHES
+    from aac.sketches import Summary, save_summary
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('raw', nargs='?', default=RAW_CSV)
+    parser.add_argument('out_dir', nargs='?', default=CLEAN_DIR, help='replaced if it holds an earlier output')
+    parser.add_argument('--reference-date', default=REFERENCE_DATE)
+    args = parser.parse_args()
+
+    summary = Summary()
+    stats = preprocess(args.raw, args.out_dir, reference_date=args.reference_date, summary=summary)
+    save_summary(summary)
+    print(f"From the initial {stats['rows_read']:,} transactions, it was down to "
+          f"{stats['rows_written']:,} transactions after cleaning "
+          f"({stats['null_job']:,} with a null job, {stats['duplicates']:,} duplicates).")
+    print(f"Summary sketches saved to {SKETCHES}")
@@ -0,0 +1,95 @@
+# Publishing the dataset for the dashboard servers
+#
+# Parses the users and transactions CSVs once, builds the cube and writes the
+# three frames as uncompressed Arrow IPC (Feather v2) files with a single
+# record batch, which the loaders memory-map without parsing or copying. The
+# transactions are written sorted by account, which is the order the account
+# lookups (aac/accounts.py) need. The files of a version are named after it
+# and never modified; the CURRENT pointer is then replaced atomically, so every
+# server process switches to the new version on its next rerun while the ones
+# still reading the old version keep a valid mapping.
+#
+# The version is a hash of the CSVs, of SCHEMA_VERSION and of the category
+# mapping category_type is derived from (aac/schema.py), so republishing the
+# same CSVs after a schema or mapping change makes a new version, and the
+# servers drop the frames and figures they cached for the old one.
+#
+#   python -m aac.publish [--keep 2]
+import argparse
+import hashlib
+import json
+import os
+import time
+
+from aac.accounts import sort_by_account
+from aac.config import (PUBLISHED_DIR, PUBLISHED_POINTER, TRANSACTIONS_CSV,
+                        USERS_CSV)
+from aac.cube import build_cube
+from aac.files import atomic_write
+from aac.loader import (csv_version, published, read_transactions_csv,
+                        read_users_csv)
+from aac.schema import SCHEMA_VERSION, category_mapping_hash
+
+
+def _write_arrow(df, path):
+    with atomic_write(path) as tmp_path:
+        df.reset_index(drop=True).to_feather(tmp_path, compression='uncompressed', chunksize=max(len(df), 1))
+
+
+def published_version(users_csv=USERS_CSV, transactions_csv=TRANSACTIONS_CSV):
+    key = f'{csv_version((users_csv, transactions_csv))}-v{SCHEMA_VERSION}-{category_mapping_hash()}'
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def publish(users_csv=USERS_CSV, transactions_csv=TRANSACTIONS_CSV, keep=2):
+    version = published_version(users_csv, transactions_csv)
+    users = read_users_csv(users_csv)
+    transactions = sort_by_account(read_transactions_csv(transactions_csv))
+    frames = {'users': users, 'transactions': transactions, 'cube': build_cube(transactions)}
+
+    os.makedirs(PUBLISHED_DIR, exist_ok=True)
+    files = {}
+    for name, df in frames.items():
+        files[name] = f'{name}-{version}.arrow'
+        _write_arrow(df, os.path.join(PUBLISHED_DIR, files[name]))
+
+    pointer = {'version': version, 'published': time.strftime('%Y-%m-%dT%H:%M:%S'), 'files': files}
+    with atomic_write(PUBLISHED_POINTER) as tmp_path, open(tmp_path, 'w') as f:
+        json.dump(pointer, f, indent=2)
+
+    prune(keep)
+    return pointer
+
+
+def prune(keep=2):
+    # Delete the files of all but the `keep` most recent versions. Processes
+    # that still map a deleted file keep reading it until they switch versions
+    # (the space is freed when the last mapping is closed).
+    versions = {}
+    for name in os.listdir(PUBLISHED_DIR):
+        if name.endswith('.arrow'):
+            path = os.path.join(PUBLISHED_DIR, name)
+            version = name.rsplit('-', 1)[1][:-len('.arrow')]
+            versions.setdefault(version, []).append(path)
+
+    current = published()['version']
+    by_age = sorted(versions, key=lambda v: max(os.path.getmtime(p) for p in versions[v]), reverse=True)
+    for version in by_age[keep:]:
+        if version == current:
+            continue
+        for path in versions[version]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # e.g. still open on Windows; removed on a later publish
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', default=USERS_CSV)
+    parser.add_argument('--transactions', default=TRANSACTIONS_CSV)
+    parser.add_argument('--keep', type=int, default=2, help='number of versions to keep')
+    args = parser.parse_args()
+
+    pointer = publish(args.users, args.transactions, args.keep)
+    print(f"Published version {pointer['version']} to {PUBLISHED_DIR}")
@@ -0,0 +1,107 @@
+# Recency, frequency and monetary (RFM) values per account
+#
+# Instead of regrouping the whole history, a small state is kept per account:
+# the time of its last transaction, the number of transactions and the total
+# amount spent. A new batch of transactions only updates the accounts it
+# contains, and the RFM values for any reference date are derived from the state.
+#
+# The ids of the batches applied so far are kept with the state (in its attrs,
+# saved in the Parquet metadata), and a batch that was already applied is
+# rejected, so that its transactions are never counted twice. The command
+# line uses the content hash of each batch file as its id.
+#
+#   python -m aac.rfm new_batch.parquet [more batches...]
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from aac.config import REFERENCE_DATE, RFM_STATE
+from aac.files import atomic_write
+
+STATE_COLUMNS = ['age', 'gender', 'last_trans', 'freq', 'mv']
+BATCH_COLUMNS = ['acct_num', 'age', 'gender', 'trans_datetime', 'amt']
+
+
+def empty_rfm_state():
+    state = pd.DataFrame({'age': pd.Series(dtype='int64'),
+                          'gender': pd.Series(dtype='object'),
+                          'last_trans': pd.Series(dtype='datetime64[ns]'),
+                          'freq': pd.Series(dtype='int64'),
+                          'mv': pd.Series(dtype='float64')})
+    state.index.name = 'acct_num'
+    state.attrs['batches'] = []
+    return state
+
+
+def update_rfm_state(state, batch, batch_id=None):
+    batches = list(state.attrs.get('batches', []))
+    if batch_id is not None:
+        if batch_id in batches:
+            raise ValueError(f'batch {batch_id} was already applied to the RFM state')
+        batches.append(batch_id)
+
+    # Summarize the batch per account (one grouped pass over the batch)
+    summary = batch.groupby('acct_num', sort=False).agg(age=('age', 'last'), gender=('gender', 'last'),
+                                                        last_trans=('trans_datetime', 'max'),
+                                                        freq=('amt', 'size'), mv=('amt', 'sum'))
+
+    # Accounts seen before: update their rows in place. One hash lookup per
+    # account of the batch finds their positions, so the cost does not grow
+    # with the size of the state.
+    positions = state.index.get_indexer(summary.index)
+    known = positions >= 0
+    old = summary[known]
+    if len(old):
+        rows = positions[known]
+        col = state.columns.get_loc
+        state.iloc[rows, col('age')] = old['age'].to_numpy()
+        state.iloc[rows, col('gender')] = old['gender'].to_numpy()
+        state.iloc[rows, col('last_trans')] = np.maximum(state['last_trans'].to_numpy()[rows],
+                                                         old['last_trans'].to_numpy())
+        state.iloc[rows, col('freq')] = state['freq'].to_numpy()[rows] + old['freq'].to_numpy()
+        state.iloc[rows, col('mv')] = state['mv'].to_numpy()[rows] + old['mv'].to_numpy()
+
+    # New accounts are appended (the only step that copies the state)
+    new = summary[~known]
+    if len(new):
+        state = new[STATE_COLUMNS] if state.empty else pd.concat([state, new[STATE_COLUMNS]])
+    state.attrs['batches'] = batches
+    return state
+
+
+def rfm_from_state(state, reference_date=REFERENCE_DATE):
+    # Same values as the notebook's groupbys on ['acct_num', 'age', 'gender']:
+    # recency is the smallest elapsed_days, i.e. the days since the last transaction
+    rfm = state[['age', 'gender']].copy()
+    rfm['recency'] = (pd.Timestamp(reference_date) - state['last_trans']).dt.days
+    rfm['freq'] = state['freq']
+    rfm['mv'] = state['mv']
+    return rfm.reset_index()
+
+
+def compute_rfm(df, reference_date=REFERENCE_DATE):
+    # RFM over a full set of transactions
+    return rfm_from_state(update_rfm_state(empty_rfm_state(), df), reference_date)
+
+
+def load_rfm_state(path=RFM_STATE):
+    if not os.path.exists(path):
+        return empty_rfm_state()
+    return pd.read_parquet(path)
+
+
+def save_rfm_state(state, path=RFM_STATE):
+    with atomic_write(path) as tmp_path:
+        state.to_parquet(tmp_path)
+
+
+if __name__ == '__main__':
+    from aac.loader import file_hash
+
+    state = load_rfm_state()
+    for batch_path in sys.argv[1:]:
+        state = update_rfm_state(state, pd.read_parquet(batch_path, columns=BATCH_COLUMNS), file_hash(batch_path))
+    save_rfm_state(state)
+    print(f"RFM state updated: {len(state):,} accounts")
@@ -0,0 +1,111 @@
+# RFM over trailing windows at several reference dates
+#
+# For every account, reference date and window (e.g. the 90, 180 and 365 days
+# before each month start): the days since the account's last transaction
+# before the reference date, and the number and total amount of its
+# transactions inside the window. A window of None covers the whole history,
+# which at REFERENCE_DATE gives the notebook's RFM values.
+#
+# The transactions are sorted once by (account, time) and the amounts summed
+# cumulatively; each window is then two binary searches into the sorted keys
+# and a difference of the cumulative sums, done for every account, date and
+# window in one vectorized searchsorted call. The frame is never refiltered.
+#
+#   python -m aac.rfm_windows --start 2020-04-01 --end 2022-01-01 --windows 90 180 365 [--segments] [--output rfm.parquet]
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from aac.clustering import FEATURES, assign_clusters
+from aac.config import REFERENCE_DATE
+
+SECONDS_PER_DAY = 86_400
+
+
+def windowed_rfm(df, reference_dates=(REFERENCE_DATE,), windows=(None,)):
+    # df needs acct_num, trans_datetime and amt. One row per account, reference
+    # date and window, for the accounts with a transaction before the date.
+    accounts, codes = np.unique(df['acct_num'].to_numpy(), return_inverse=True)
+    seconds = df['trans_datetime'].to_numpy(dtype='datetime64[s]').astype(np.int64)
+    first = seconds.min() if len(seconds) else 0
+    span = (seconds.max() - first if len(seconds) else 0) + 2  # offsets 0..span-1 stay inside one account
+
+    # Sort by the composite key (account, time) and sum the amounts cumulatively
+    keys = codes.astype(np.int64) * span + (seconds - first)
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    amounts = np.concatenate([[0.0], np.cumsum(df['amt'].to_numpy(dtype=np.float64)[order])])
+
+    refs = pd.to_datetime(list(reference_dates)).to_numpy(dtype='datetime64[s]').astype(np.int64)
+    starts = [None if window is None else window * SECONDS_PER_DAY for window in windows]
+
+    # Window bounds as keys, shape (accounts, dates, windows): [ref - window, ref)
+    base = np.arange(len(accounts), dtype=np.int64)[:, None, None] * span
+    end_offset = np.clip(refs - first, 0, span - 1)[None, :, None]
+    start_offset = np.stack([np.zeros_like(refs) if start is None else np.clip(refs - start - first, 0, span - 1)
+                             for start in starts], axis=1)[None, :, :]
+    hi = np.searchsorted(keys, base + end_offset, side='left')
+    lo = np.searchsorted(keys, base + start_offset, side='left')
+    account_start = np.searchsorted(keys, base, side='left')
+    hi, lo = np.broadcast_arrays(hi, lo)
+
+    # The last transaction before the reference date (whatever the window) gives the recency
+    has_history = hi > account_start
+    last_seconds = keys[np.maximum(hi - 1, 0)] - base + first
+    recency = (refs[None, :, None] - last_seconds) // SECONDS_PER_DAY
+
+    shape = hi.shape
+    rfm = pd.DataFrame({
+        'acct_num': np.broadcast_to(accounts[:, None, None], shape).ravel(),
+        'reference_date': np.broadcast_to(refs.astype('datetime64[s]')[None, :, None], shape).ravel().astype('datetime64[ns]'),
+        'window_days': np.broadcast_to(np.array([np.nan if w is None else w for w in windows])[None, None, :], shape).ravel(),
+        'recency': recency.ravel(),
+        'freq': (hi - lo).ravel(),
+        'mv': (amounts[hi] - amounts[lo]).ravel(),
+    })
+    rfm = rfm[has_history.ravel()].reset_index(drop=True)
+    rfm['window_days'] = rfm['window_days'].astype('Int64')  # missing: whole history
+    return rfm
+
+
+def monthly_reference_dates(start, end):
+    # Month starts from start to end (inclusive)
+    return list(pd.date_range(start, end, freq='MS'))
+
+
+def segment_drift(rfm, model):
+    # Cluster of each account at each reference date (nearest centroid of the
+    # saved model), as an account x date table
+    labels = assign_clusters(model, rfm[FEATURES].to_numpy(dtype=float))
+    return (rfm.assign(labels=labels)
+               .pivot(index='acct_num', columns='reference_date', values='labels'))
+
+
+if __name__ == '__main__':
+    from aac.config import CLEAN_DIR
+    from aac.preprocessing import read_clean
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clean-dir', default=CLEAN_DIR)
+    parser.add_argument('--start', default='2020-04-01')
+    parser.add_argument('--end', default=REFERENCE_DATE)
+    parser.add_argument('--windows', type=int, nargs='*', default=[90, 180, 365],
+                        help='trailing windows in days (the whole history is always included)')
+    parser.add_argument('--segments', action='store_true',
+                        help='print the cluster of each account per month (whole-history RFM)')
+    parser.add_argument('--output', default=None, help='write the RFM values to this Parquet file')
+    args = parser.parse_args()
+
+    df = read_clean(args.clean_dir, columns=['acct_num', 'trans_datetime', 'amt'])
+    dates = monthly_reference_dates(args.start, args.end)
+    rfm = windowed_rfm(df, dates, [None, *args.windows])
+    print(rfm.groupby(['reference_date', 'window_days'], dropna=False)[['freq', 'mv']].sum().to_string())
+
+    if args.segments:
+        from aac.clustering import load_model
+
+        drift = segment_drift(rfm[rfm['window_days'].isna()], load_model())
+        print(drift.apply(lambda labels: labels.value_counts()).fillna(0).astype(int).to_string())
+    if args.output:
+        rfm.to_parquet(args.output, index=False)
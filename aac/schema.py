@@ -0,0 +1,92 @@
+# Column dtypes of the users and transactions frames
+#
+# Low-cardinality strings become categoricals (one small integer code per
+# row), account and card numbers become int64 instead of float, the other
+# numbers are downcast to the smallest integer type that fits their range and
+# timestamps become datetime64. `amt` and `mv` stay float64 so that sums over
+# millions of rows keep their cents.
+#
+#   python -m aac.schema   # memory per column before and after, for both datasets
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+from aac.config import (CATEGORY_TYPES, DIGITAL_CATS, GENERATIONS,
+                        PHYSICAL_CATS, TRANSACTIONS_CSV, USERS_CSV)
+
+# Bump when a schema changes so that columnar files written with the old one are not reused
+SCHEMA_VERSION = 2
+
+CATEGORY_TYPE_DTYPE = pd.CategoricalDtype(CATEGORY_TYPES)
+GENERATION_DTYPE = pd.CategoricalDtype(GENERATIONS, ordered=True)
+
+# Formats of the timestamps in the CSV exports
+DATETIME_FORMATS = {'trans_datetime': '%Y-%m-%d %H:%M:%S', 'trans_dob': '%Y-%m-%d'}
+
+# One row per account: city and job are nearly unique there, so they stay strings
+USER_SCHEMA = {'gender': 'category', 'city_pop': 'int32',
+               'acct_num': 'int64', 'acct_num2': 'int64', 'trans_dob': 'datetime64[ns]',
+               'age': 'int16', 'generation': GENERATION_DTYPE,
+               'recency': 'int32', 'freq': 'int32', 'mv': 'float64', 'labels': 'category'}
+
+TRANSACTION_SCHEMA = {**USER_SCHEMA,
+                      'cc_num': 'int64', 'city': 'category', 'job': 'category', 'dob': 'category', 'unix_time': 'int64',
+                      'category': 'category', 'amt': 'float64', 'category_type': CATEGORY_TYPE_DTYPE,
+                      'trans_datetime': 'datetime64[ns]', 'trans_hour': 'int8', 'trans_month': 'int8',
+                      'trans_year': 'int16', 'elapsed_days': 'int32'}
+
+
+def apply_schema(df, schema):
+    for col, dtype in schema.items():
+        if col not in df:
+            continue
+        if dtype == 'datetime64[ns]' and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = pd.to_datetime(df[col], format=DATETIME_FORMATS.get(col))
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def add_category_type(df, physical_cats=PHYSICAL_CATS, digital_cats=DIGITAL_CATS):
+    # Classify each distinct category once and broadcast the result through the
+    # categorical codes instead of calling a Python function for every row
+    category = df['category'].astype('category')
+    type_of = {cat: 'Physical' for cat in physical_cats}
+    type_of.update({cat: 'Digital' for cat in digital_cats})
+    type_codes = np.array([CATEGORY_TYPES.index(type_of.get(cat, 'Others'))
+                           for cat in category.cat.categories] + [-1])
+    codes = type_codes[category.cat.codes.to_numpy()]  # code -1 (missing) stays missing
+    df['category_type'] = pd.Categorical.from_codes(codes, dtype=CATEGORY_TYPE_DTYPE)
+    return df
+
+
+def category_mapping_hash(physical_cats=PHYSICAL_CATS, digital_cats=DIGITAL_CATS):
+    # Changes whenever the mapping add_category_type uses changes, so that the
+    # cached and published frames holding category_type can be keyed on it
+    mapping = {'Physical': sorted(physical_cats), 'Digital': sorted(digital_cats)}
+    return hashlib.sha256(json.dumps(mapping).encode()).hexdigest()[:8]
+
+
+def memory_report(before, after):
+    # Bytes per column (strings included) before and after the dtypes were fixed
+    # (derived columns such as category_type only appear in `after`)
+    report = pd.DataFrame({'dtype_before': before.dtypes.astype(str),
+                           'bytes_before': before.memory_usage(index=False, deep=True),
+                           'dtype_after': after.dtypes.astype(str),
+                           'bytes_after': after.memory_usage(index=False, deep=True)}, index=after.columns)
+    report = report.fillna({'dtype_before': '', 'bytes_before': 0}).astype({'bytes_before': 'int64'})
+    report.loc['total'] = ['', report['bytes_before'].sum(), '', report['bytes_after'].sum()]
+    report['saved'] = 1 - report['bytes_after'] / report['bytes_before'].replace(0, np.nan)
+    return report
+
+
+if __name__ == '__main__':
+    for path, schema in [(USERS_CSV, USER_SCHEMA), (TRANSACTIONS_CSV, TRANSACTION_SCHEMA)]:
+        before = pd.read_csv(path)
+        after = apply_schema(before.copy(), schema)
+        if 'category' in after:
+            after = add_category_type(after)
+        print(path)
+        print(memory_report(before, after).to_string(formatters={'saved': '{:.0%}'.format}), end='\n\n')
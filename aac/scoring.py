@@ -0,0 +1,126 @@
+# Assigning accounts to clusters from their RFM values
+#
+# The cluster model (data/cluster_model.json: scaler parameters, centroids and
+# cluster ids) is loaded once and kept with its centroids already scaled; it is
+# reloaded when the file is replaced by a refit. An account's cluster is its
+# nearest centroid in the scaled space, computed for a whole batch at once by
+# aac.clustering.assign_clusters.
+#
+# MicroBatcher serves callers that score one account at a time (e.g. one per
+# request): the vectors submitted within a few milliseconds of each other are
+# scored together by one worker thread, which keeps the per-vector cost of a
+# batch while each caller only waits for its own result.
+#
+#   python -m aac.scoring 25 1309 91383.46   # cluster of one account's recency, freq, mv
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from aac.clustering import assign_clusters, load_model, scaled_centroids
+from aac.config import CLUSTER_MODEL
+
+
+class Scorer:
+    def __init__(self, path=CLUSTER_MODEL):
+        self.path = path
+        self._stat = None
+        self._lock = threading.Lock()
+        self._reload()
+
+    def _reload(self):
+        stat = os.stat(self.path)
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if key == self._stat:
+            return
+        model = load_model(self.path)
+        model.update({name: np.asarray(model[name], dtype=float) for name in ['scaler_mean', 'scaler_scale']},
+                     cluster_ids=np.asarray(model['cluster_ids']))
+        # Swapped in one assignment, so concurrent score calls see either model
+        self._params = (model, scaled_centroids(model))
+        self._stat = key
+
+    def refresh(self):
+        # Pick up a refitted model (cheap when the file has not changed)
+        with self._lock:
+            self._reload()
+
+    @property
+    def features(self):
+        return self._params[0]['features']
+
+    def score(self, X):
+        # Cluster ids for an (n, 3) array of raw recency, freq, mv values;
+        # a single vector gives a single id
+        model, centroids = self._params
+        X = np.asarray(X, dtype=float)
+        single = X.ndim == 1
+        labels = assign_clusters(model, X.reshape(-1, X.shape[-1]), centroids)
+        return labels[0] if single else labels
+
+    def score_frame(self, rfm):
+        # Cluster ids for a frame with the model's feature columns
+        return self.score(rfm[self.features].to_numpy(dtype=float))
+
+
+class MicroBatcher:
+    def __init__(self, scorer, max_batch=1024, max_delay=0.002):
+        self.scorer = scorer
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='aac-scoring', daemon=True)
+        self._thread.start()
+
+    def submit(self, rfm):
+        # Future with the cluster id of one (recency, freq, mv) vector
+        rfm = np.asarray(rfm, dtype=float)
+        if rfm.shape != (len(self.scorer.features),):
+            raise ValueError(f'expected one value per feature {self.scorer.features}, got shape {rfm.shape}')
+        future = Future()
+        self._queue.put((rfm, future))
+        return future
+
+    def score(self, rfm, timeout=None):
+        return self.submit(rfm).result(timeout)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.perf_counter() + self.max_delay
+            # Wait up to max_delay for more vectors, or until the batch is full
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._queue.put(None)  # stop after this batch
+                    break
+                batch.append(item)
+
+            futures = [future for _, future in batch]
+            try:
+                labels = self.scorer.score(np.array([rfm for rfm, _ in batch], dtype=float))
+            except Exception as err:
+                for future in futures:
+                    future.set_exception(err)
+                continue
+            for future, label in zip(futures, labels.tolist()):
+                future.set_result(label)
+
+
+if __name__ == '__main__':
+    print(Scorer().score([float(value) for value in sys.argv[1:4]]))
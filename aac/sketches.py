@@ -0,0 +1,425 @@
+# Streaming summaries of the transactions in bounded memory
+#
+# The EDA numbers (distinct accounts, holders per city, generation, gender and
+# age, the busiest categories and jobs, the amount quantiles) are kept as
+# sketches that are updated one chunk at a time during preprocessing, saved as
+# JSON and merged across partitions or days, so they never need the full
+# history in memory. Error bounds:
+#
+#   HyperLogLog (distinct accounts, p=14): exact up to 2**p / 8 distinct
+#     values (2,048; 128 for the per-value sketches, p=10), then a relative
+#     standard error of 1.04 / sqrt(2**p) = 0.8% (3.3% with p=10)
+#   SpaceSaving (transactions per city, category, job; capacity k): every
+#     value with more than N / k of the N transactions is listed, and each
+#     count overestimates by at most its `error` (itself at most N / k)
+#   TDigest (amt, compression 200): count, mean, min and max are exact;
+#     quantiles are within 0.5% of rank, closer in the tails (measured: under
+#     0.02% of rank on 2M lognormal values merged from 40 chunks)
+#
+# Holders per value (city, generation, gender, age) are distinct account
+# counts, i.e. the notebook's value_counts over unique_holders, so the age
+# statistics describe holders rather than transactions.
+#
+#   python -m aac.sketches show [data/sketches.json]
+#   python -m aac.sketches merge out.json day1.json day2.json ...
+import base64
+import json
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from aac.config import SKETCHES
+from aac.files import atomic_write
+
+
+def _bit_length(x):
+    # Bit length of each uint64 (frexp is exact on the two 32-bit halves)
+    high = np.frexp((x >> np.uint64(32)).astype(np.float64))[1]
+    low = np.frexp((x & np.uint64(0xFFFFFFFF)).astype(np.float64))[1]
+    return np.where(high > 0, 32 + high, low)
+
+
+class HyperLogLog:
+    # Sparse while it has seen fewer than 2**p / 8 distinct values: their
+    # 64-bit hashes are kept (exact count, no more memory than the registers);
+    # past that the hashes are folded into the 2**p registers
+    def __init__(self, p=14):
+        self.p = p
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.registers = None
+
+    def update(self, values):
+        values = np.asarray(values)
+        self._add(pd.util.hash_array(values[~pd.isna(values)]))
+        return self
+
+    def _add(self, hashes):
+        if self.registers is None:
+            self.hashes = np.union1d(self.hashes, hashes)
+            if len(self.hashes) > (1 << self.p) // 8:
+                self._densify()
+        else:
+            self._fold(hashes)
+
+    def _densify(self):
+        self.registers = np.zeros(1 << self.p, dtype=np.uint8)
+        self._fold(self.hashes)
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def _fold(self, hashes):
+        # The first p bits of a hash pick a register, which keeps the longest
+        # run of leading zeros seen in the remaining bits (plus one)
+        width = 64 - self.p
+        index = (hashes >> np.uint64(width)).astype(np.intp)
+        rank = width + 1 - _bit_length(hashes & np.uint64((1 << width) - 1))
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError(f'cannot merge HyperLogLogs with p={self.p} and p={other.p}')
+        if other.registers is None:
+            self._add(other.hashes)
+        else:
+            if self.registers is None:
+                self._densify()
+            np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def estimate(self):
+        if self.registers is None:
+            return float(len(self.hashes))
+        m = len(self.registers)
+        raw = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            return m * math.log(m / zeros)  # linear counting
+        return float(raw)
+
+    def to_dict(self):
+        if self.registers is None:
+            return {'p': self.p, 'hashes': base64.b64encode(self.hashes.astype('<u8').tobytes()).decode()}
+        return {'p': self.p, 'registers': base64.b64encode(self.registers.tobytes()).decode()}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['p'])
+        if 'hashes' in data:
+            sketch.hashes = np.frombuffer(base64.b64decode(data['hashes']), dtype='<u8').astype(np.uint64)
+        else:
+            sketch.registers = np.frombuffer(base64.b64decode(data['registers']), dtype=np.uint8).copy()
+        return sketch
+
+
+class DistinctCounts:
+    # Distinct keys per value of a column (e.g. account holders per city),
+    # one small HyperLogLog per value
+    def __init__(self, p=10):
+        self.p = p
+        self.sketches = {}
+
+    def update(self, values, keys):
+        pairs = pd.DataFrame({'value': np.asarray(values, dtype=object), 'key': keys}).dropna().drop_duplicates()
+        for value, group in pairs.groupby('value', sort=False)['key']:
+            self.sketches.setdefault(value, HyperLogLog(self.p)).update(group.to_numpy())
+        return self
+
+    def merge(self, other):
+        for value, sketch in other.sketches.items():
+            self.sketches.setdefault(value, HyperLogLog(self.p)).merge(sketch)
+        return self
+
+    def counts(self):
+        counts = pd.Series({value: round(sketch.estimate()) for value, sketch in self.sketches.items()},
+                           dtype='int64', name='count')
+        return counts.sort_values(ascending=False, kind='stable')
+
+    def to_dict(self):
+        return {'p': self.p, 'values': [[value, sketch.to_dict()] for value, sketch in self.sketches.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['p'])
+        sketch.sketches = {value: HyperLogLog.from_dict(hll) for value, hll in data['values']}
+        return sketch
+
+
+class SpaceSaving:
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+
+    def update(self, values):
+        # The values of a chunk are counted first and added with their weights
+        counts = pd.Series(np.asarray(values, dtype=object)).value_counts()
+        self.total += int(counts.sum())
+        for value, weight in zip(counts.index.tolist(), counts.tolist()):
+            self._add(value, weight)
+        return self
+
+    def _add(self, value, weight):
+        if value in self.counts:
+            self.counts[value] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[value] = weight
+            self.errors[value] = 0
+        else:
+            # The new value takes over the smallest counter (and its count as error)
+            smallest = min(self.counts, key=self.counts.get)
+            floor = self.counts.pop(smallest)
+            del self.errors[smallest]
+            self.counts[value] = floor + weight
+            self.errors[value] = floor
+
+    def _floor(self):
+        # Upper bound of the count of any value not listed
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def merge(self, other):
+        # Mergeable summaries (Agarwal et al., 2012): a value missing from one
+        # side may have had up to that side's smallest count there
+        floor, other_floor = self._floor(), other._floor()
+        values = self.counts.keys() | other.counts.keys()
+        counts = {v: self.counts.get(v, floor) + other.counts.get(v, other_floor) for v in values}
+        errors = {v: self.errors.get(v, floor) + other.errors.get(v, other_floor) for v in values}
+        kept = sorted(values, key=counts.get, reverse=True)[:self.capacity]
+        self.counts = {v: counts[v] for v in kept}
+        self.errors = {v: errors[v] for v in kept}
+        self.total += other.total
+        return self
+
+    def top(self, n=10):
+        # Estimated count (at most `error` too high) of the n most frequent values
+        top = sorted(self.counts, key=self.counts.get, reverse=True)[:n]
+        return pd.DataFrame({'count': [self.counts[v] for v in top], 'error': [self.errors[v] for v in top]},
+                            index=pd.Index(top))
+
+    def to_dict(self):
+        return {'capacity': self.capacity, 'total': self.total,
+                'counters': [[value, self.counts[value], self.errors[value]] for value in self.counts]}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['capacity'])
+        sketch.total = data['total']
+        for value, count, error in data['counters']:
+            sketch.counts[value] = count
+            sketch.errors[value] = error
+        return sketch
+
+
+class TDigest:
+    def __init__(self, compression=200):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.count += len(values)
+            self.total += float(values.sum())
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            self._compress(np.concatenate([self.means, values]),
+                           np.concatenate([self.weights, np.ones(len(values))]))
+        return self
+
+    def _compress(self, means, weights):
+        # Sorted points are merged into the centroids whose quantile range fits
+        # in one unit of the k1 scale (compression/2pi * asin(2q - 1)): many
+        # small centroids in the tails, fewer and larger ones near the median
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1))
+        starts = np.flatnonzero(np.concatenate([[True], k[1:] != k[:-1]]))
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def merge(self, other):
+        if other.count:
+            self.count += other.count
+            self.total += other.total
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress(np.concatenate([self.means, other.means]),
+                           np.concatenate([self.weights, other.weights]))
+        return self
+
+    def quantile(self, q):
+        # Interpolated between the centroid centers, with the exact min and max at the ends
+        if not self.count:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else math.nan
+        cumulative = np.cumsum(self.weights)
+        positions = np.concatenate([[0], cumulative - self.weights / 2, [cumulative[-1]]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(np.asarray(q) * cumulative[-1], positions, values)
+
+    def describe(self):
+        # Like Series.describe() (without std)
+        quartiles = self.quantile([0.25, 0.5, 0.75]) if self.count else [math.nan] * 3
+        return pd.Series({'count': self.count, 'mean': self.total / self.count if self.count else math.nan,
+                          'min': self.min if self.count else math.nan, '25%': quartiles[0], '50%': quartiles[1],
+                          '75%': quartiles[2], 'max': self.max if self.count else math.nan})
+
+    def to_dict(self):
+        return {'compression': self.compression, 'count': self.count, 'total': self.total,
+                'min': self.min if self.count else None, 'max': self.max if self.count else None,
+                'means': self.means.tolist(), 'weights': self.weights.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['compression'])
+        sketch.count, sketch.total = data['count'], data['total']
+        if sketch.count:
+            sketch.min, sketch.max = data['min'], data['max']
+        sketch.means = np.asarray(data['means'], dtype=np.float64)
+        sketch.weights = np.asarray(data['weights'], dtype=np.float64)
+        return sketch
+
+
+def describe_counts(counts):
+    # Series.describe() of a column given as {value: number of rows}
+    counts = counts[counts > 0].sort_index()
+    values, weights = counts.index.to_numpy(dtype=np.float64), counts.to_numpy(dtype=np.float64)
+    n = weights.sum()
+    if not n:
+        return pd.Series(dtype='float64')
+    cumulative = np.cumsum(weights)
+
+    def at(position):  # value of the row at a 0-based position, linearly interpolated
+        lo, hi = math.floor(position), math.ceil(position)
+        below, above = values[np.searchsorted(cumulative, [lo, hi], side='right')]
+        return below + (above - below) * (position - lo)
+
+    mean = np.average(values, weights=weights)
+    std = math.sqrt(np.sum(weights * (values - mean) ** 2) / (n - 1)) if n > 1 else math.nan
+    return pd.Series({'count': n, 'mean': mean, 'std': std, 'min': values[0],
+                      '25%': at(0.25 * (n - 1)), '50%': at(0.5 * (n - 1)), '75%': at(0.75 * (n - 1)),
+                      'max': values[-1]})
+
+
+class Summary:
+    HOLDERS = ['city', 'generation', 'gender', 'age']
+    TOP = ['city', 'category', 'job']
+
+    def __init__(self):
+        self.rows = 0
+        self.first_time = None
+        self.last_time = None
+        self.accounts = HyperLogLog()
+        self.holders = {col: DistinctCounts() for col in self.HOLDERS}
+        self.top = {col: SpaceSaving() for col in self.TOP}
+        self.amt = TDigest()
+
+    def update(self, df):
+        # df: cleaned transactions (see aac.preprocessing.clean_chunk)
+        if not len(df):
+            return self
+        self.rows += len(df)
+        first, last = int(df['unix_time'].min()), int(df['unix_time'].max())
+        self.first_time = first if self.first_time is None else min(self.first_time, first)
+        self.last_time = last if self.last_time is None else max(self.last_time, last)
+        # Accounts are hashed as integers (the raw acct_num is parsed as a float)
+        known = df[df['acct_num'].notna()]
+        accounts = known['acct_num'].to_numpy().astype(np.int64)
+        self.accounts.update(accounts)
+        for col, sketch in self.holders.items():
+            sketch.update(known[col].astype(object).to_numpy(), accounts)
+        for col, sketch in self.top.items():
+            sketch.update(df[col].to_numpy())
+        self.amt.update(df['amt'].to_numpy())
+        return self
+
+    def merge(self, other):
+        if other.rows:
+            self.first_time = other.first_time if self.first_time is None else min(self.first_time, other.first_time)
+            self.last_time = other.last_time if self.last_time is None else max(self.last_time, other.last_time)
+        self.rows += other.rows
+        self.accounts.merge(other.accounts)
+        for col in self.HOLDERS:
+            self.holders[col].merge(other.holders[col])
+        for col in self.TOP:
+            self.top[col].merge(other.top[col])
+        self.amt.merge(other.amt)
+        return self
+
+    def headline(self):
+        # The numbers shown on the Methodology page
+        return {'transactions': self.rows,
+                'accounts': round(self.accounts.estimate()),
+                'first_transaction': pd.Timestamp(self.first_time, unit='s') if self.rows else None,
+                'last_transaction': pd.Timestamp(self.last_time, unit='s') if self.rows else None}
+
+    def to_dict(self):
+        return {'rows': self.rows, 'first_time': self.first_time, 'last_time': self.last_time,
+                'accounts': self.accounts.to_dict(),
+                'holders': {col: sketch.to_dict() for col, sketch in self.holders.items()},
+                'top': {col: sketch.to_dict() for col, sketch in self.top.items()},
+                'amt': self.amt.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data):
+        summary = cls()
+        summary.rows, summary.first_time, summary.last_time = data['rows'], data['first_time'], data['last_time']
+        summary.accounts = HyperLogLog.from_dict(data['accounts'])
+        summary.holders = {col: DistinctCounts.from_dict(sketch) for col, sketch in data['holders'].items()}
+        summary.top = {col: SpaceSaving.from_dict(sketch) for col, sketch in data['top'].items()}
+        summary.amt = TDigest.from_dict(data['amt'])
+        return summary
+
+
+def save_summary(summary, path=SKETCHES):
+    with atomic_write(path) as tmp_path, open(tmp_path, 'w') as f:
+        json.dump(summary.to_dict(), f)
+
+
+_loaded = {}
+
+
+def load_summary(path=SKETCHES):
+    # Parsed again only when the file changes; None if there is no summary yet
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = (path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if key not in _loaded:
+        with open(path) as f:
+            summary = Summary.from_dict(json.load(f))
+        _loaded.clear()
+        _loaded[key] = summary
+    return _loaded[key]
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['merge']:
+        merged = Summary()
+        for path in sys.argv[3:]:
+            if load_summary(path) is None:
+                raise SystemExit(f'no summary at {path}')
+            merged.merge(load_summary(path))
+        save_summary(merged, sys.argv[2])
+        print(f"Merged {len(sys.argv) - 3} summaries into {sys.argv[2]}")
+    else:
+        summary = load_summary(sys.argv[2] if len(sys.argv) > 2 else SKETCHES)
+        if summary is None:
+            raise SystemExit('no summary yet: run python -m aac.preprocessing first')
+        print('\n'.join(f'{name}: {value}' for name, value in summary.headline().items()), end='\n\n')
+        print(summary.holders['city'].counts().head(5).to_string(), end='\n\n')
+        print(summary.holders['generation'].counts().to_string(), end='\n\n')
+        print(describe_counts(summary.holders['age'].counts()).to_string(), end='\n\n')
+        for col in Summary.TOP:
+            print(summary.top[col].top(5).to_string(), end='\n\n')
+        print(summary.amt.describe().to_string())
@@ -0,0 +1,115 @@
+# Cluster profiles as plain Python data
+#
+# The numbers behind the Results page (the info table, the generation counts
+# and the spending breakdowns), computed from the users and the aggregate
+# cube and returned as JSON-ready dicts and lists. The dashboard and the HTTP
+# API (aac.api) both use them.
+import numpy as np
+import pandas as pd
+
+from aac.config import CATEGORY_TYPES, GENERATIONS
+from aac.cube import average_amount, avg_monthly_spending
+from aac.loader import cluster_cube, dataset_version, derived, load_cube, load_users
+
+PARTS = ['info', 'generations', 'spending_by_type', 'spending_by_category', 'monthly_spending']
+
+
+def _value(x):
+    # numpy scalars and NaN to JSON-compatible values
+    if isinstance(x, (np.integer, np.bool_)):
+        return x.item()
+    if isinstance(x, (float, np.floating)):
+        return None if np.isnan(x) else float(x)
+    return x
+
+
+def _table(frame):
+    # {row: {column: value}}, keeping the row and column order
+    return {str(row): {str(col): _value(value) for col, value in values.items()}
+            for row, values in frame.to_dict(orient='index').items()}
+
+
+def clusters():
+    return [_value(k) for k in cluster_stats().index]
+
+
+def _build_cluster_stats():
+    users = load_users()
+    cube = load_cube()
+
+    # Account and age statistics in one pass over the users
+    stats = users.groupby('labels', observed=True)['age'].agg(
+        users='size', min_age='min', mean_age='mean', max_age='max')
+    stats['mean_age'] = stats['mean_age'].round(2)
+    stats.insert(0, 'transactions', cube.groupby('labels', observed=True)['amt_count'].sum())
+
+    # Number of accounts per generation
+    generations = users.groupby(['labels', 'generation'], observed=True).size().unstack('generation')
+    generations = generations.reindex(columns=GENERATIONS).fillna(0).astype('int64')
+
+    # Share of the amount spent on each category type
+    amounts = cube.groupby(['labels', 'category_type'], observed=True)['amt_sum'].sum().unstack('category_type')
+    amounts = amounts.reindex(columns=CATEGORY_TYPES).fillna(0)
+    shares = amounts.div(amounts.sum(axis=1), axis=0)
+    shares.columns = [f'share_{category_type.lower()}' for category_type in CATEGORY_TYPES]
+
+    stats = stats.join(generations).join(shares)
+    stats['transactions'] = stats['transactions'].fillna(0).astype('int64')
+    stats.index = pd.Index(stats.index.astype('int64'), name='cluster')
+    stats.columns.name = None
+    return stats
+
+
+def cluster_stats():
+    # One row per cluster: transactions, users, min/mean/max age, the number of
+    # users per generation and the share of spending per category type
+    return derived('cluster-stats', _build_cluster_stats)
+
+
+def cluster_info(k):
+    stats = cluster_stats()
+    return {'transactions': _value(stats.at[k, 'transactions']),
+            'users': _value(stats.at[k, 'users']),
+            'min_age': _value(stats.at[k, 'min_age']),
+            'mean_age': _value(stats.at[k, 'mean_age']),
+            'max_age': _value(stats.at[k, 'max_age']),
+            'spending_share': {category_type: _value(stats.at[k, f'share_{category_type.lower()}'])
+                               for category_type in CATEGORY_TYPES}}
+
+
+def generation_counts(k):
+    stats = cluster_stats()
+    return {generation: _value(stats.at[k, generation]) for generation in GENERATIONS
+            if stats.at[k, generation] > 0}
+
+
+def spending_by_type(k):
+    # Average amount per category type (rows) and generation (columns), rounded
+    return _table(average_amount(cluster_cube(k), 'category_type', 'generation').round())
+
+
+def spending_by_category(k):
+    return _table(average_amount(cluster_cube(k), 'category', 'generation').round())
+
+
+def monthly_spending(k):
+    avg = avg_monthly_spending(cluster_cube(k))
+    return [{'month': date.strftime('%Y-%m'), 'Physical': _value(physical), 'Digital': _value(digital)}
+            for date, physical, digital in zip(avg['date'], avg['Physical'], avg['Digital'])]
+
+
+def cluster_profile(k, parts=PARTS):
+    if k not in clusters():
+        raise KeyError(f'no cluster {k}')
+    part_functions = {'info': cluster_info, 'generations': generation_counts,
+                      'spending_by_type': spending_by_type, 'spending_by_category': spending_by_category,
+                      'monthly_spending': monthly_spending}
+    return {'cluster': k, 'version': dataset_version(),
+            **{part: part_functions[part](k) for part in parts}}
+
+
+if __name__ == '__main__':
+    import json
+
+    for k in clusters():
+        print(json.dumps(cluster_profile(k, ['info', 'generations'])))
@@ -0,0 +1,79 @@
+# Benchmark: one account's transactions, boolean mask vs AccountStore
+#
+# Builds a synthetic transactions frame (in random order, as parsed from the
+# CSV) and a users table, then times building the store (sort + offsets, and
+# offsets only for rows already sorted as published) and looking up random
+# accounts, against the mask over the whole frame that a lookup would
+# otherwise take.
+#
+# Run from the project root:
+#   python benchmarks/bench_accounts.py --rows 50000000 --accounts 1000000
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aac.accounts import AccountStore  # noqa: E402
+from aac.config import CATEGORY_NAMES  # noqa: E402
+
+START = pd.Timestamp('2020-01-01').value // 10**9
+END = pd.Timestamp('2021-12-07').value // 10**9
+
+
+def synthetic(rows, accounts, seed=0):
+    rng = np.random.default_rng(seed)
+    acct_nums = np.sort(rng.choice(9 * 10**11, accounts, replace=False)) + 10**11
+    transactions = pd.DataFrame({
+        'acct_num': acct_nums[rng.integers(0, accounts, rows)],
+        'trans_datetime': pd.to_datetime(rng.integers(START, END, rows), unit='s'),
+        'category': pd.Categorical.from_codes(rng.integers(0, len(CATEGORY_NAMES), rows),
+                                              categories=list(CATEGORY_NAMES)),
+        'amt': np.round(rng.gamma(2.0, 40.0, rows), 2),
+    })
+    users = pd.DataFrame({'acct_num': rng.permutation(acct_nums),
+                          'labels': rng.integers(0, 6, accounts)})
+    return transactions, users
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--accounts', type=int, default=200_000)
+    parser.add_argument('--lookups', type=int, default=1000)
+    args = parser.parse_args()
+
+    transactions, users = synthetic(args.rows, args.accounts)
+    sample = np.random.default_rng(1).choice(users['acct_num'].to_numpy(), args.lookups)
+
+    t = time.perf_counter()
+    for acct_num in sample[:3]:
+        transactions[transactions['acct_num'] == acct_num]
+    mask_s = (time.perf_counter() - t) / 3
+
+    t = time.perf_counter()
+    store = AccountStore(transactions, users)
+    build_s = time.perf_counter() - t
+    del transactions  # the store keeps its own sorted copy
+
+    # Published datasets are already sorted by account: only the offsets are built
+    t = time.perf_counter()
+    AccountStore(store.transactions, users)
+    presorted_s = time.perf_counter() - t
+
+    latencies = []
+    for acct_num in sample:
+        t = time.perf_counter()
+        user, rows = store.lookup(acct_num)
+        latencies.append(time.perf_counter() - t)
+    ms = np.array(latencies) * 1e3
+
+    print(f'{args.rows:,} transactions, {args.accounts:,} accounts')
+    print(f'boolean mask per account   {mask_s * 1e3:10.1f} ms')
+    print(f'store build (sort+offsets) {build_s:10.2f} s')
+    print(f'store build (presorted)    {presorted_s:10.2f} s')
+    print(f'lookup p50 / p99 / max     {np.percentile(ms, 50):10.3f} / {np.percentile(ms, 99):.3f} / {ms.max():.3f} ms')
@@ -0,0 +1,89 @@
+# Benchmark: average monthly spending, original implementation vs avg_monthly_spending
+#
+# Run from the project root:
+#   python benchmarks/bench_monthly_spending.py --rows 10000000
+import argparse
+import calendar
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aac.config import CATEGORY_TYPES  # noqa: E402
+from aac.cube import avg_monthly_spending  # noqa: E402
+
+
+def synthetic_transactions(rows, start='2018-01-01', end='2023-12-31', seed=42):
+    rng = np.random.default_rng(seed)
+    start_s, end_s = pd.Timestamp(start).value // 10**9, pd.Timestamp(end).value // 10**9
+    trans_datetime = pd.to_datetime(rng.integers(start_s, end_s, rows), unit='s')
+    return pd.DataFrame({
+        'trans_datetime': trans_datetime,
+        'trans_year': trans_datetime.year,
+        'trans_month': trans_datetime.month,
+        'category_type': pd.Categorical.from_codes(rng.integers(0, 3, rows), categories=CATEGORY_TYPES),
+        'amt': np.round(rng.gamma(2.0, 40.0, rows), 2),
+    })
+
+
+# The data part of plot_avg_monthly_spending before the rewrite (2020 and 2021 only)
+def original_avg_monthly_spending(df):
+    physical_trans = df[df['category_type'] == "Physical"].sort_values(by='trans_datetime')
+    physical_trans = physical_trans[['trans_year', 'trans_month', 'amt']]
+    digital_trans = df[df['category_type'] == "Digital"].sort_values(by='trans_datetime')
+    digital_trans = digital_trans[['trans_year', 'trans_month', 'amt']]
+
+    frames = {}
+    for name, trans in [('Physical', physical_trans), ('Digital', digital_trans)]:
+        per_year = []
+        for year in [2020, 2021]:
+            year_trans = trans[trans['trans_year'] == year][['trans_month', 'amt']]
+            data = year_trans.groupby('trans_month')['amt'].mean().to_frame(name='avg').reset_index()
+            data['month'] = data['trans_month'].apply(lambda x: calendar.month_name[x])
+            data['date'] = pd.to_datetime((f"{year} " + data['month']), format='%Y %B')
+            data.drop(columns=['trans_month', 'month'], axis=1, inplace=True)
+            per_year.append(data)
+        data = pd.concat(per_year, ignore_index=True)
+        data['avg'] = data['avg'].apply(lambda x: round(x))
+        frames[name] = data.rename(columns={"avg": name})
+
+    return frames['Physical'].merge(frames['Digital'], on='date', how='inner')
+
+
+def best_of(func, df, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(df)
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    df = synthetic_transactions(args.rows)
+    original_time, original = best_of(original_avg_monthly_spending, df, args.repeat)
+    new_time, new = best_of(avg_monthly_spending, df, args.repeat)
+
+    # Both must agree on the months the original covers
+    both = original.merge(new, on='date', suffixes=('_original', '_new'))
+    assert len(both) == len(original)
+    assert (both['Physical_original'] == both['Physical_new']).all()
+    assert (both['Digital_original'] == both['Digital_new']).all()
+
+    print(f"rows: {args.rows:,}")
+    print(f"original: {original_time:.3f}s ({len(original)} months, 2020-2021 only)")
+    print(f"new:      {new_time:.3f}s ({len(new)} months, {new['date'].min():%Y-%m} to {new['date'].max():%Y-%m})")
+    print(f"speedup:  {original_time / new_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
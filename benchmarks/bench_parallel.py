@@ -0,0 +1,104 @@
+# Benchmark: aac.parallel against the single-threaded pandas aggregations
+#
+# On synthetic transactions, computes the notebook's aggregations (the RFM
+# groupbys, the amount per category, the city and generation value_counts and
+# the generation x category pivot table) with pandas and with aac.parallel
+# for each number of workers, checks that the results agree (counts, minima
+# and maxima exactly, sums and means to float rounding) and prints the times.
+#
+# Run from the project root:
+#   python benchmarks/bench_parallel.py --rows 20000000 --workers 1 2 4 8 16 32
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aac import parallel  # noqa: E402
+from aac.config import CATEGORY_NAMES, GENERATIONS, REFERENCE_DATE  # noqa: E402
+
+START = pd.Timestamp('2020-01-01').value // 10**9
+END = pd.Timestamp('2021-12-07').value // 10**9
+CITIES = [f'City {i}' for i in range(500)]
+
+
+def synthetic(rows, accounts, seed=0):
+    rng = np.random.default_rng(seed)
+    acct_nums = rng.choice(9 * 10**11, accounts, replace=False) + 10**11
+    ages = rng.integers(18, 95, accounts)
+    account = rng.integers(0, accounts, rows)
+    return pd.DataFrame({
+        'acct_num': acct_nums[account],
+        'age': ages[account],
+        'gender': pd.Categorical.from_codes(rng.integers(0, 2, accounts)[account], categories=['F', 'M']),
+        'city': pd.Categorical.from_codes(rng.integers(0, len(CITIES), accounts)[account], categories=CITIES),
+        'generation': pd.Categorical.from_codes(np.minimum((95 - ages[account]) // 20, len(GENERATIONS) - 1),
+                                                categories=GENERATIONS),
+        'category': pd.Categorical.from_codes(rng.integers(0, len(CATEGORY_NAMES), rows),
+                                              categories=list(CATEGORY_NAMES)),
+        'trans_datetime': pd.to_datetime(rng.integers(START, END, rows), unit='s'),
+        'amt': np.round(rng.gamma(2.0, 40.0, rows), 2),
+    })
+
+
+def with_pandas(df):
+    rfm = df.groupby(['acct_num', 'age', 'gender'], observed=True).agg(
+        last_trans=('trans_datetime', 'max'), freq=('amt', 'size'), mv=('amt', 'sum'))
+    rfm.insert(0, 'recency', (pd.Timestamp(REFERENCE_DATE) - rfm.pop('last_trans')).dt.days)
+    return {'rfm': rfm.reset_index(),
+            'category': df.groupby('category', observed=True)['amt'].sum().to_frame(),
+            # Without the categories that have no rows, which the parallel version never lists
+            'city': df['city'].value_counts().loc[lambda counts: counts > 0].sort_index().to_frame(),
+            'generation': df['generation'].value_counts().loc[lambda counts: counts > 0].sort_index().to_frame(),
+            'pivot': pd.pivot_table(df, values='amt', index='generation', columns='category',
+                                    aggfunc='mean', observed=True)}
+
+
+def with_parallel(df, workers):
+    return {'rfm': parallel.rfm(df, workers=workers),
+            'category': parallel.aggregate(df, 'category', workers, amt=('amt', 'sum')),
+            'city': parallel.value_counts(df, 'city', workers).sort_index().to_frame(),
+            'generation': parallel.value_counts(df, 'generation', workers).sort_index().to_frame(),
+            'pivot': parallel.pivot_table(df, 'amt', 'generation', 'category', workers=workers)}
+
+
+def max_difference(expected, actual):
+    # Largest relative difference of the float columns; the others must be equal
+    expected, actual = expected.reset_index(), actual.reset_index()
+    assert list(expected.columns) == list(actual.columns) and len(expected) == len(actual)
+    worst = 0.0
+    for col in expected:
+        a, b = expected[col], actual[col]
+        if pd.api.types.is_float_dtype(a):
+            assert np.allclose(a, b, rtol=1e-9, atol=0, equal_nan=True), col
+            worst = max(worst, float(np.nanmax(np.abs(a - b) / np.abs(a).clip(lower=1e-300))))
+        else:
+            assert (a.astype(object).to_numpy() == b.astype(object).to_numpy()).all(), col
+    return worst
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--accounts', type=int, default=100_000)
+    parser.add_argument('--workers', type=int, nargs='*', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    df = synthetic(args.rows, args.accounts)
+    t = time.perf_counter()
+    expected = with_pandas(df)
+    pandas_s = time.perf_counter() - t
+    print(f'{args.rows:,} transactions, {args.accounts:,} accounts, {os.cpu_count()} cores')
+    print(f"{'pandas':<12}{pandas_s:8.2f} s")
+
+    for workers in args.workers:
+        t = time.perf_counter()
+        actual = with_parallel(df, workers)
+        seconds = time.perf_counter() - t
+        worst = max(max_difference(expected[name], actual[name]) for name in expected)
+        print(f"{f'{workers} workers':<12}{seconds:8.2f} s  speedup {pandas_s / seconds:5.2f}x  "
+              f"max relative difference {worst:.1e}")
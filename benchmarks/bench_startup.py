@@ -0,0 +1,99 @@
+# Benchmark: cold start of the dashboard
+#
+# Every measurement runs in a fresh interpreter, as in a newly started
+# container (the OS file cache stays warm, so disk reads are not included):
+#   - import time of streamlit and of each heavy library the app can load
+#   - time to first paint of the landing page, i.e. the first complete script
+#     run, with the libraries loaded by then
+#   - time of the first run of each other page in that process, which pays
+#     for the libraries that page loads lazily
+#
+# Run from the project root:
+#   python benchmarks/bench_startup.py [--repeat 5]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LIBRARIES = ['streamlit', 'numpy', 'pandas', 'pyarrow', 'plotly.express', 'matplotlib.pyplot', 'sklearn']
+PAGES = ['About the Project', 'Methodology', 'Results', 'Summary']
+
+IMPORT_SCRIPT = """
+import sys, time
+t = time.perf_counter()
+import {module}
+print(time.perf_counter() - t)
+"""
+
+PAINT_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+
+libraries = {libraries!r}
+before = set(sys.modules)
+at = AppTest.from_file('app.py', default_timeout=300)
+t = time.perf_counter()
+at.run()
+result = {{'first_paint': time.perf_counter() - t,
+          'loaded': [lib for lib in libraries if lib in sys.modules and lib not in before],
+          'exceptions': [e.value for e in at.exception]}}
+if {page!r} != {home!r}:
+    at.sidebar.radio[0].set_value({page!r})
+    t = time.perf_counter()
+    at.run()
+    result['page'] = time.perf_counter() - t
+    result['exceptions'] += [e.value for e in at.exception]
+print(json.dumps(result))
+"""
+
+
+def _python(script):
+    out = subprocess.run([sys.executable, '-c', script], cwd=ROOT, check=True,
+                         capture_output=True, text=True).stdout
+    return out.strip().splitlines()[-1]
+
+
+def import_times(repeat):
+    return {module: statistics.median(float(_python(IMPORT_SCRIPT.format(module=module)))
+                                      for _ in range(repeat))
+            for module in LIBRARIES}
+
+
+def paint_times(repeat):
+    results = {}
+    for page in PAGES:
+        runs = [json.loads(_python(PAINT_SCRIPT.format(libraries=LIBRARIES, page=page, home=PAGES[0])))
+                for _ in range(repeat)]
+        errors = [error for run in runs for error in run['exceptions']]
+        if errors:
+            raise SystemExit(f'{page}: {errors[0]}')
+        results[page] = {'first_paint': statistics.median(run['first_paint'] for run in runs),
+                         'page': statistics.median(run.get('page', run['first_paint']) for run in runs),
+                         'loaded': runs[0]['loaded']}
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per measurement (median)')
+    parser.add_argument('--output', default=None, help='also write the results to this JSON file')
+    args = parser.parse_args()
+
+    imports = import_times(args.repeat)
+    print(f"{'import (fresh interpreter)':<28}{'s':>8}")
+    for module, seconds in imports.items():
+        print(f'{module:<28}{seconds:>8.3f}')
+
+    paints = paint_times(args.repeat)
+    print(f"\n{'page':<20}{'first paint s':>14}{'page run s':>12}  libraries loaded by the landing page")
+    for page, result in paints.items():
+        loaded = ', '.join(result['loaded']) if page == PAGES[0] else ''
+        print(f"{page:<20}{result['first_paint']:>14.3f}{result['page']:>12.3f}  {loaded}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'imports': imports, 'pages': paints}, f, indent=2)
@@ -0,0 +1,228 @@
+# Benchmark of the whole pipeline on synthetic data
+#
+# For each size, a raw file in the cc_dirty.csv format is generated and every
+# stage is timed in order: preprocessing, RFM, the KMeans sweep, labelling,
+# loading the two CSVs (cold, then from the columnar cache), building the
+# cube and building the dashboard figures. The peak memory of each stage is
+# recorded too, and the results are saved as JSON so that two commits can be
+# compared.
+#
+#   python benchmarks/run.py --rows 10000 100000 1000000
+#   python benchmarks/run.py compare benchmarks/results/old.json benchmarks/results/new.json
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCHMARKS_DIR)
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, 'results')
+
+# Columns of data/s1_users_csv.csv before the RFM values
+USER_COLUMNS = ['gender', 'city', 'city_pop', 'job', 'dob', 'acct_num', 'acct_num2', 'trans_dob', 'age', 'generation']
+
+
+def _reset_peak_rss():
+    # Linux lets a process reset its peak RSS (VmHWM); elsewhere the peak is
+    # the process-wide one
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def _peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / (1024 if sys.platform == 'darwin' else 1)
+
+
+class Stages:
+    def __init__(self):
+        self.results = []
+
+    def run(self, name, func, *args, **kwargs):
+        _reset_peak_rss()
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        self.results.append({'stage': name, 'seconds': round(seconds, 4),
+                             'peak_rss_mb': round(_peak_rss_mb(), 1)})
+        print(f"  {name:<20} {seconds:9.3f}s {self.results[-1]['peak_rss_mb']:9.1f} MB", flush=True)
+        return result
+
+
+def run_size(rows, accounts, workdir, chunksize, sweep_range):
+    import numpy as np
+    import pandas as pd
+    from sklearn.preprocessing import StandardScaler
+
+    from aac import figures, loader
+    from aac.clustering import FEATURES
+    from aac.config import TRANSACTIONS_CSV, USERS_CSV
+    from aac.model_selection import run_kmeans, sweep_k
+    from aac.preprocessing import preprocess, read_clean
+    from aac.rfm import compute_rfm
+    from synthetic import write_raw_csv
+
+    raw_path = os.path.join(workdir, 'cc_dirty.csv')
+    clean_dir = os.path.join(workdir, 'clean')
+    stages = Stages()
+
+    stages.run('generate', write_raw_csv, raw_path, rows, accounts)
+    stages.run('preprocess', preprocess, raw_path, clean_dir, chunksize)
+    df = stages.run('load_clean', read_clean, clean_dir)
+    cluster_df = stages.run('rfm', compute_rfm, df)
+
+    scaled_data = StandardScaler().fit_transform(cluster_df[FEATURES])
+    report = stages.run('kmeans_sweep', sweep_k, scaled_data, sweep_range)
+
+    # Label the accounts with k=6 (as the notebook does) and export the two CSVs.
+    # The frames are passed in rather than captured, since they are deleted
+    # before the loading stages.
+    def label(df, cluster_df, scaled_data):
+        _, labels = run_kmeans(min(6, len(cluster_df)), scaled_data)
+        cluster_df['labels'] = labels
+        rfm = cluster_df[['acct_num', 'recency', 'freq', 'mv', 'labels']]
+        users = df.drop_duplicates(subset=['acct_num'])[USER_COLUMNS].merge(rfm, on='acct_num')
+        return users, df.merge(rfm, on='acct_num')
+
+    users, df_with_label = stages.run('label', label, df, cluster_df, scaled_data)
+
+    def export(users, df_with_label):
+        users.to_csv(USERS_CSV, index=False)
+        df_with_label.to_csv(TRANSACTIONS_CSV, index=False)
+
+    stages.run('export_csv', export, users, df_with_label)
+    del df, df_with_label
+
+    stages.run('load_csv_cold', lambda: (loader.load_users(), loader.load_transactions()))
+    loader.clear_memory_cache()
+    stages.run('load_columnar', lambda: (loader.load_users(), loader.load_transactions()))
+    stages.run('build_cube', loader.load_cube)
+
+    clusters = [k for k in users['labels'].unique() if k is not None]
+
+    def build_figures():
+        builders = [(figures.gender_distribution,), (figures.generation_distribution,),
+                    (figures.top_city_distribution,), (figures.category_per_trans,), (figures.category_per_amt,)]
+        for k in clusters:
+            builders += [(figures.cluster_generation_distribution, k), (figures.phys_digi_avg_spending_per_gen, k),
+                         (figures.cat_lvl_avg_spending_per_gen, k), (figures.plot_avg_monthly_spending, k)]
+        for builder, *args in builders:
+            builder(*args)
+        return len(builders)
+
+    stages.run('figures', build_figures)
+
+    transactions = loader.load_transactions()
+
+    def chart_aggregates_from_transactions():
+        # What the chart functions computed before the cube: one pivot per chart and cluster
+        for k in clusters:
+            c_trans = transactions[transactions['labels'] == k]
+            pd.pivot_table(c_trans, values='amt', index='category_type', columns='generation', observed=True)
+            pd.pivot_table(c_trans, values='amt', index='category', columns='generation', observed=True)
+            c_trans.groupby(['trans_year', 'trans_month', 'category_type'], observed=True)['amt'].mean()
+
+    stages.run('chart_aggs_rows', chart_aggregates_from_transactions)
+
+    return {'rows': rows, 'accounts': int(len(cluster_df)), 'stages': stages.results,
+            'elbow_k': int(report.index[report['elbow']][0]) if np.any(report['elbow']) else None}
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark(args):
+    # The dataset paths are read from AAC_DATA_DIR when aac.config is imported,
+    # so the synthetic data directory has to be set first
+    workdir = tempfile.mkdtemp(prefix='aac-bench-')
+    os.environ['AAC_DATA_DIR'] = workdir
+    sys.path[:0] = [ROOT, BENCHMARKS_DIR]
+
+    import pandas as pd
+
+    from aac import loader
+
+    results = {'commit': _git_commit(), 'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+               'python': platform.python_version(), 'pandas': pd.__version__,
+               'cpus': os.cpu_count(), 'sizes': []}
+    try:
+        for rows in args.rows:
+            print(f"{rows:,} rows")
+            size_dir = os.path.join(workdir, str(rows))
+            os.makedirs(size_dir)
+            loader.clear_memory_cache()
+            results['sizes'].append(run_size(rows, args.accounts, size_dir, args.chunksize,
+                                             range(2, args.max_k + 1)))
+            shutil.rmtree(size_dir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = args.output or os.path.join(RESULTS_DIR, f"{results['created'].replace(':', '')}-{results['commit']}.json")
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {path}")
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    print(f"{baseline['commit']} -> {candidate['commit']}")
+    baseline_sizes = {size['rows']: size for size in baseline['sizes']}
+    for size in candidate['sizes']:
+        if size['rows'] not in baseline_sizes:
+            continue
+        print(f"{size['rows']:,} rows")
+        before = {stage['stage']: stage for stage in baseline_sizes[size['rows']]['stages']}
+        for stage in size['stages']:
+            if stage['stage'] not in before:
+                continue
+            old = before[stage['stage']]
+            ratio = stage['seconds'] / old['seconds'] if old['seconds'] else float('nan')
+            print(f"  {stage['stage']:<20} {old['seconds']:9.3f}s -> {stage['seconds']:9.3f}s ({ratio:5.2f}x)"
+                  f"  {old['peak_rss_mb']:9.1f} -> {stage['peak_rss_mb']:9.1f} MB")
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'compare':
+        parser = argparse.ArgumentParser(prog='run.py compare')
+        parser.add_argument('baseline')
+        parser.add_argument('candidate')
+        compare(parser.parse_args(sys.argv[2:]))
+        return
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='sizes to run, up to 50M rows')
+    parser.add_argument('--accounts', type=int, default=None, help='default: one per 1,000 rows (at least 100)')
+    parser.add_argument('--chunksize', type=int, default=500_000)
+    parser.add_argument('--max-k', type=int, default=10)
+    parser.add_argument('--output', default=None)
+    benchmark(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
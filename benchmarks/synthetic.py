@@ -0,0 +1,89 @@
+# Synthetic transactions in the same format as cc_dirty.csv
+#
+# Each account gets fixed holder details (gender, city, job, dob); transactions
+# are drawn uniformly over the accounts and over Jan 01, 2020 - Dec 07, 2021.
+# Like the real dump, some rows have no job/acct_num, some have no category,
+# gender mixes "M"/"Male" and some rows are exact duplicates. The file is
+# written in chunks, so any number of rows can be generated in bounded memory.
+#
+#   python benchmarks/synthetic.py cc_dirty.csv --rows 1000000
+import argparse
+
+import numpy as np
+import pandas as pd
+
+CATEGORIES = ['grocery_pos', 'gas_transport', 'shopping_pos', 'misc_pos', 'grocery_net', 'shopping_net',
+              'misc_net', 'kids_pets', 'home', 'personal_care', 'food_dining', 'entertainment',
+              'health_fitness', 'travel']
+CITIES = ['San Fernando', 'Dasmarinas', 'Calapan', 'Masbate', 'Pagadian', 'Digos', 'Navotas',
+          'Valenzuela', 'Iloilo', 'Tacloban', 'Baguio', 'Naga', 'Cebu', 'Davao', 'Lipa']
+JOBS = ['Chartered loss adjuster', 'Administrator, charities/voluntary organisations', 'Radiographer, diagnostic',
+        'Secondary school teacher', 'Operational investment banker', 'Surveyor, mining', 'Nurse, adult',
+        'Engineer, civil (consulting)', 'Accountant, chartered', 'Retail manager']
+COLUMNS = ['cc_num', 'gender', 'city', 'city_pop', 'job', 'dob', 'acct_num', 'acct_num2',
+           'trans_num', 'unix_time', 'category', 'amt']
+
+START = pd.Timestamp('2020-01-01').value // 10**9
+END = pd.Timestamp('2021-12-07').value // 10**9
+
+
+def make_accounts(accounts, seed=0):
+    rng = np.random.default_rng(seed)
+    acct_num = (10**8 + rng.choice(9 * 10**8, accounts, replace=False)) * 1000
+    dob = pd.to_datetime(rng.integers(pd.Timestamp('1926-01-01').value // 10**9,
+                                      pd.Timestamp('1971-12-31').value // 10**9, accounts), unit='s')
+    return pd.DataFrame({
+        'cc_num': rng.integers(10**11, 5 * 10**15, accounts),
+        'gender': rng.choice(['M', 'F'], accounts, p=[0.93, 0.07]),
+        'city': rng.choice(CITIES, accounts),
+        'city_pop': [f"{pop:,} people" for pop in rng.integers(20_000, 2_000_000, accounts)],
+        'job': rng.choice(JOBS, accounts),
+        'dob': dob.strftime('%d/%m/%Y'),
+        'acct_num': acct_num.astype(float),
+        'acct_num2': acct_num,
+        # Heavier users make more transactions, as in the real data
+        'weight': rng.pareto(1.5, accounts) + 0.05,
+    })
+
+
+def iter_raw_chunks(rows, accounts=None, chunk_rows=1_000_000, seed=0,
+                    null_job_rate=0.08, null_category_rate=0.08, duplicate_rate=0.02):
+    accounts = make_accounts(accounts or max(100, rows // 1000), seed)
+    weights = (accounts['weight'] / accounts['weight'].sum()).to_numpy()
+    holder = accounts[COLUMNS[:8]]
+    rng = np.random.default_rng(seed + 1)
+
+    written = 0
+    while written < rows:
+        n = min(chunk_rows, rows - written)
+        unique = n - int(n * duplicate_rate)
+
+        chunk = holder.iloc[rng.choice(len(accounts), unique, p=weights)].reset_index(drop=True)
+        chunk['gender'] = np.where(rng.random(unique) < 0.3, chunk['gender'].map({'M': 'Male', 'F': 'Female'}),
+                                   chunk['gender'])
+        chunk['trans_num'] = pd.Series(rng.integers(0, 2**63, unique)).map('{:032x}'.format)
+        chunk['unix_time'] = rng.integers(START, END, unique)
+        chunk['category'] = pd.Series(rng.choice(CATEGORIES, unique)).where(rng.random(unique) >= null_category_rate)
+        chunk['amt'] = '$' + pd.Series(np.round(rng.gamma(1.5, 50.0, unique) + 1, 2)).astype(str)
+
+        missing = rng.random(unique) < null_job_rate
+        chunk.loc[missing, ['job', 'acct_num']] = np.nan
+
+        duplicates = chunk.iloc[rng.integers(0, unique, n - unique)]
+        yield pd.concat([chunk, duplicates], ignore_index=True).sample(frac=1, random_state=seed + written)
+        written += n
+
+
+def write_raw_csv(path, rows, accounts=None, chunk_rows=1_000_000, seed=0):
+    for i, chunk in enumerate(iter_raw_chunks(rows, accounts, chunk_rows, seed)):
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('path')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--accounts', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_raw_csv(args.path, args.rows, args.accounts, seed=args.seed)